@@ -1,9 +1,11 @@
 import streamlit as st
-import pandas as pd
 from io import BytesIO
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from copy import copy
+from functools import lru_cache
 from pathlib import Path
-import openpyxl # Importeer openpyxl expliciet, hoewel het door pandas gebruikt wordt
 
 # --- Configuratie ---
 BASE_DIR = Path(__file__).resolve().parent
@@ -12,9 +14,100 @@ CONFIG_DIR = BASE_DIR / "config"
 STATIC_DIR = BASE_DIR / "static" # Definieer static map pad
 
 # Laad field mapping
-with open(CONFIG_DIR / "field_mapping.json", "r") as f:
+with open(CONFIG_DIR / "field_mapping.json", "r", encoding="utf-8") as f:
     FIELD_MAPPING = json.load(f)
 
+# Progress indicator stappen
+PROGRESS_STEPS = ('Template Keuze', 'Bestelbaarheid', 'Producttype', 'Chemicaliën',
+                  'Staffelprijzen', 'GS1 Sync', 'Zorginstellingen', 'Overzicht')
+
+PRODUCT_TYPES = (
+    'Allemaal facilitair',
+    'Allemaal medisch',
+    'Allemaal laboratorium',
+    'Gemixte producten'
+)
+
+# Lijst van alle zorginstellingen (alfabetisch gesorteerd)
+ORGANIZATIONS = (
+    "Academisch Ziekenhuis Maastricht",
+    "Academisch Medisch Centrum",
+    "AMCU",
+    "Bergman BZ Rijswijk B.V",
+    "CareCtrl",
+    "GHX",
+    "Hogeschool InHolland",
+    "Hogeschool van Amsterdam",
+    "Hospital Logistics",
+    "Jeroen Bosch Ziekenhuis",
+    "LUMC",
+    "Market4Care Nederland",
+    "Maxima Medisch Centrum",
+    "NKI-AVL",
+    "Noordwest Ziekenhuisgroep",
+    "Parnassia Groep",
+    "Prinses Máxima Centrum voor kinderoncologie",
+    "Prothya Biosolutions Netherlands B.V.",
+    "RIVM",
+    "Sanquin Bloedvoorziening",
+    "Stena Line",
+    "Technische Universteit Delft",
+    "UMC Groningen",
+    "UMC Utrecht",
+    "Universiteit Leiden",
+    "Universiteit Twente",
+    "Universiteit Utrecht",
+    "Universiteit van Amsterdam",
+    "Vincent van Gogh",
+    "Vincent van Gogh (Vigo Groep)",
+    "VU Medisch Centrum",
+    "Zorgservice XL",
+    "GDSN van GS1"
+)
+
+# Lege antwoorden; organizations wordt bij een reset als nieuwe lijst gezet
+_DEFAULT_ANSWERS = {
+    'template_choice': None,
+    'all_orderable': None,
+    'product_type': None,
+    'chemicals_present': None,
+    'volume_pricing': None,
+    'gs1_sync': None,
+    'organizations': ()
+}
+
+# Aantal te verbergen velden per antwoord (zie calculate_hidden_fields)
+HIDE_COUNTS = {
+    'all_orderable': 5,       # Bestelbaarheid-gerelateerde velden
+    'no_chemicals': 8,        # Chemische veiligheidsvelden
+    'no_volume_pricing': 6,   # Staffelprijs velden
+    'no_gs1': 12,             # GS1-specifieke velden
+    'few_organizations': 5    # Algemene velden bij minder dan 10 instellingen
+}
+
+# Gemixte producten: geen velden verbergen
+PRODUCT_HIDE_COUNTS = {
+    'Allemaal facilitair': 15,    # Medische en lab velden
+    'Allemaal medisch': 12,       # Facilitaire en lab velden
+    'Allemaal laboratorium': 10   # Facilitaire en medische velden
+}
+
+MAX_HIDDEN_FIELDS = 50
+
+# Stapnummer per stap voor de progress indicator
+_STEP_INDEX = {
+    'welcome': 0,
+    'template_choice': 0,
+    'question1': 1,
+    'question2': 2,
+    'question3': 3,
+    'question4': 4,
+    'question5': 5,
+    'question6': 6,
+    'question7': 7,
+    'summary': 8
+}
+
 def main():
     st.set_page_config(
         page_title="GHX Template Generator",
@@ -40,71 +133,32 @@ def main():
     st.title("GHX Template Generator")
 
     # Initialize session state
-    if 'step' not in st.session_state:
-        st.session_state.step = 'welcome'
+    st.session_state.setdefault('step', 'welcome')
     if 'answers' not in st.session_state:
-        st.session_state.answers = {
-            'template_choice': None,
-            'all_orderable': None,
-            'product_type': None,
-            'chemicals_present': None,
-            'volume_pricing': None,
-            'gs1_sync': None,
-            'organizations': []
-        }
+        _reset_answers()
     
     # Progress indicator - Uitgebreid naar 8 stappen
-    progress_steps = ['Template Keuze', 'Bestelbaarheid', 'Producttype', 'Chemicaliën', 
-                      'Staffelprijzen', 'GS1 Sync', 'Zorginstellingen', 'Overzicht']
     current_step_idx = get_current_step_index(st.session_state.step)
     
     # Zorg ervoor dat de progress waarde tussen 0.0 en 1.0 blijft
-    progress_value = min(current_step_idx / (len(progress_steps) - 1), 1.0)
+    progress_value = min(current_step_idx / (len(PROGRESS_STEPS) - 1), 1.0)
     st.progress(progress_value)
     if current_step_idx == 0:
-        st.markdown(f"**Stap {current_step_idx + 1}/{len(progress_steps)}**")
+        st.markdown(f"**Stap {current_step_idx + 1}/{len(PROGRESS_STEPS)}**")
     else:
-        st.markdown(f"**Stap {current_step_idx + 1}/{len(progress_steps)}:** {progress_steps[current_step_idx]}")
+        st.markdown(f"**Stap {current_step_idx + 1}/{len(PROGRESS_STEPS)}:** {PROGRESS_STEPS[current_step_idx]}")
     
     # Render current step
     render_step(st.session_state.step)
 
+def _reset_answers():
+    st.session_state.answers = {**_DEFAULT_ANSWERS, 'organizations': []}
+
 def get_current_step_index(step):
-    step_map = {
-        'welcome': 0,
-        'template_choice': 0,
-        'question1': 1,
-        'question2': 2,
-        'question3': 3,
-        'question4': 4,
-        'question5': 5,
-        'question6': 6,
-        'question7': 7,
-        'summary': 8
-    }
-    return step_map.get(step, 0)
+    return _STEP_INDEX.get(step, 0)
 
 def render_step(step):
-    if step == 'welcome':
-        show_welcome()
-    elif step == 'template_choice':
-        show_template_choice()
-    elif step == 'question1':
-        show_question1()
-    elif step == 'question2':
-        show_question2()
-    elif step == 'question3':
-        show_question3()
-    elif step == 'question4':
-        show_question4()
-    elif step == 'question5':
-        show_question5()
-    elif step == 'question6':
-        show_question6()
-    elif step == 'question7':
-        show_question7()
-    elif step == 'summary':
-        show_summary()
+    _STEP_RENDERERS.get(step, show_welcome)()
 
 def show_welcome():
     st.markdown("""
@@ -228,16 +282,9 @@ def show_question2():
     Voor leveranciers met verschillende typen producten. In dit geval blijven alle velden zichtbaar.
     """)
 
-    product_types = [
-        'Allemaal facilitair',
-        'Allemaal medisch',
-        'Allemaal laboratorium',
-        'Gemixte producten'
-    ]
-    
     col1, col2 = st.columns(2)
     
-    for i, product_type in enumerate(product_types):
+    for i, product_type in enumerate(PRODUCT_TYPES):
         col = col1 if i < 2 else col2
         with col:
             if st.button(product_type, use_container_width=True, key=f"product_type_{i}"):
@@ -348,6 +395,12 @@ def show_question5():
         st.session_state.step = 'question4'
         st.rerun()
 
+def _select_all_organizations():
+    st.session_state.org_multi = list(ORGANIZATIONS)
+
+def _unselect_all_organizations():
+    st.session_state.org_multi = []
+
 def show_question6():
     st.header("Zorginstellingen")
     
@@ -367,112 +420,54 @@ def show_question6():
     Beschikbare zorginstellingen:
     """)
     
-    # Lijst van alle zorginstellingen (alfabetisch gesorteerd)
-    organizations = [
-        "Academisch Ziekenhuis Maastricht",
-        "Academisch Medisch Centrum",
-        "AMCU",
-        "Bergman BZ Rijswijk B.V",
-        "CareCtrl",
-        "GHX",
-        "Hogeschool InHolland",
-        "Hogeschool van Amsterdam",
-        "Hospital Logistics",
-        "Jeroen Bosch Ziekenhuis",
-        "LUMC",
-        "Market4Care Nederland",
-        "Maxima Medisch Centrum",
-        "NKI-AVL",
-        "Noordwest Ziekenhuisgroep",
-        "Parnassia Groep",
-        "Prinses Máxima Centrum voor kinderoncologie",
-        "Prothya Biosolutions Netherlands B.V.",
-        "RIVM",
-        "Sanquin Bloedvoorziening",
-        "Stena Line",
-        "Technische Universteit Delft",
-        "UMC Groningen",
-        "UMC Utrecht",
-        "Universiteit Leiden",
-        "Universiteit Twente",
-        "Universiteit Utrecht",
-        "Universiteit van Amsterdam",
-        "Vincent van Gogh",
-        "Vincent van Gogh (Vigo Groep)",
-        "VU Medisch Centrum",
-        "Zorgservice XL",
-        "GDSN van GS1"
-    ]
-    
-    # Een lege regel voor betere spacing
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    # Snelle selectie met een duidelijker kop
-    st.markdown("#### Snelle selectie:")
-    
-    # Twee knoppen naast elkaar
+    # Snelle selectie met een duidelijker kop (lege regel ervoor voor betere spacing)
+    st.markdown("<br>\n\n#### Snelle selectie:", unsafe_allow_html=True)
+    
+    # Twee knoppen naast elkaar; de callbacks zetten de multiselect vóór de rerun
     quick_col1, quick_col2 = st.columns(2)
     with quick_col1:
-        select_all = st.button("✅ Selecteer alle zorginstellingen", use_container_width=True)
+        st.button("✅ Selecteer alle zorginstellingen", use_container_width=True,
+                  on_click=_select_all_organizations)
     with quick_col2:
-        unselect_all = st.button("❌ Deselecteer alle zorginstellingen", use_container_width=True)
-    
-    # Haal de huidige selectie op uit session state
-    current_selection = st.session_state.answers.get('organizations', [])
-    
-    # Verwerk selecteer/deselecteer alle
-    if select_all:
-        current_selection = organizations.copy()
-        st.session_state.answers['organizations'] = current_selection
-    elif unselect_all:
-        current_selection = []
-        st.session_state.answers['organizations'] = current_selection
-    
-    # Een lege regel voor betere spacing
-    st.markdown("<br>", unsafe_allow_html=True)
-    
-    st.markdown("#### Selecteer zorginstellingen:")
-    
-    # Bereken het middelpunt om de lijst in twee te splitsen
-    mid_point = len(organizations) // 2
-    
-    # Maak twee kolommen
-    col1, col2 = st.columns(2)
-    
-    new_selection = []
-    
-    # Eerste helft van de lijst in kolom 1
-    with col1:
-        for org in organizations[:mid_point]:
-            if st.checkbox(org, value=(org in current_selection), key=f"org_{org}"):
-                new_selection.append(org)
-    
-    # Tweede helft van de lijst in kolom 2
-    with col2:
-        for org in organizations[mid_point:]:
-            if st.checkbox(org, value=(org in current_selection), key=f"org_{org}"):
-                new_selection.append(org)
-    
-    # Update session state
-    st.session_state.answers['organizations'] = new_selection
-    
-    # Toon het aantal geselecteerde zorginstellingen
-    if new_selection:
-        st.markdown(f"**U heeft {len(new_selection)} zorginstelling(en) geselecteerd.**")
-    
-    # Navigatieknoppen
-    nav_col1, nav_col2 = st.columns(2)
-    
-    with nav_col1:
-        if st.button("← Terug", use_container_width=True):
-            st.session_state.step = 'question5'
-            st.rerun()
+        st.button("❌ Deselecteer alle zorginstellingen", use_container_width=True,
+                  on_click=_unselect_all_organizations)
+    
+    # Start met de opgeslagen selectie uit session state
+    if 'org_multi' not in st.session_state:
+        st.session_state.org_multi = list(st.session_state.answers.get('organizations', []))
+    
+    # Lege regel voor betere spacing, samen met de kop in één element
+    st.markdown("<br>\n\n#### Selecteer zorginstellingen:", unsafe_allow_html=True)
+    
+    # Formulier: wijzigingen in de selectie leiden pas bij bevestigen tot een rerun
+    with st.form("org_form"):
+        st.multiselect(
+            "Selecteer zorginstellingen",
+            ORGANIZATIONS,
+            key='org_multi',
+            label_visibility="collapsed"
+        )
+        submitted = st.form_submit_button("Volgende →", use_container_width=True)
     
-    with nav_col2:
-        # Disable 'Volgende' knop als er geen selectie is
-        if st.button("Volgende →", use_container_width=True, disabled=len(new_selection) == 0):
+    if submitted:
+        # Behoud de volgorde van de organisatielijst
+        selected = set(st.session_state.org_multi)
+        new_selection = [org for org in ORGANIZATIONS if org in selected]
+        st.session_state.answers['organizations'] = new_selection
+        
+        if new_selection:
             st.session_state.step = 'question7'
             st.rerun()
+        else:
+            st.warning("⚠️ Selecteer minimaal één zorginstelling.")
+    elif st.session_state.org_multi:
+        # Toon het aantal geselecteerde zorginstellingen
+        st.markdown(f"**U heeft {len(st.session_state.org_multi)} zorginstelling(en) geselecteerd.**")
+    
+    # Navigatie
+    if st.button("← Terug", use_container_width=True):
+        st.session_state.step = 'question5'
+        st.rerun()
 
 def show_question7():
     st.header("Overzicht en Bevestiging")
@@ -524,10 +519,10 @@ def show_question7():
         orgs = answers.get('organizations', [])
         if orgs:
             st.success(f"✅ {len(orgs)} zorginstelling(en) geselecteerd")
-            for org in orgs[:5]:  # Toon eerste 5
-                st.write(f"   • {org}")
+            org_lines = [f"• {org}" for org in orgs[:5]]  # Toon eerste 5
             if len(orgs) > 5:
-                st.write(f"   • ... en {len(orgs) - 5} meer")
+                org_lines.append(f"• ... en {len(orgs) - 5} meer")
+            st.markdown("  \n".join(org_lines))
         else:
             st.error("❌ Geen zorginstellingen geselecteerd")
     
@@ -542,15 +537,7 @@ def show_question7():
     with col2:
         if st.button("🔄 Opnieuw beginnen", use_container_width=True):
             st.session_state.step = 'welcome'
-            st.session_state.answers = {
-                'template_choice': None,
-                'all_orderable': None,
-                'product_type': None,
-                'chemicals_present': None,
-                'volume_pricing': None,
-                'gs1_sync': None,
-                'organizations': []
-            }
+            _reset_answers()
             st.rerun()
     
     with col3:
@@ -569,26 +556,34 @@ def show_summary():
         st.subheader("Uw selectie:")
         col1, col2 = st.columns(2)
         
+        # Eén markdown element per kolom
         with col1:
-            st.markdown(f"**Template keuze:** {'📋 Standaard' if answers.get('template_choice') == 'standard' else '⚙️ Aangepast'}")
-            st.markdown(f"**Bestelbaarheid:** {'✅ Alle producten bestelbaar' if answers.get('all_orderable') else '❌ Niet alle producten bestelbaar'}")
-            st.markdown(f"**Product type:** {answers.get('product_type', 'Niet geselecteerd')}")
-            st.markdown(f"**Chemicaliën:** {'⚠️ Aanwezig' if answers.get('chemicals_present') else '✅ Niet aanwezig'}")
+            st.markdown("\n\n".join([
+                f"**Template keuze:** {'📋 Standaard' if answers.get('template_choice') == 'standard' else '⚙️ Aangepast'}",
+                f"**Bestelbaarheid:** {'✅ Alle producten bestelbaar' if answers.get('all_orderable') else '❌ Niet alle producten bestelbaar'}",
+                f"**Product type:** {answers.get('product_type', 'Niet geselecteerd')}",
+                f"**Chemicaliën:** {'⚠️ Aanwezig' if answers.get('chemicals_present') else '✅ Niet aanwezig'}"
+            ]))
         
         with col2:
-            st.markdown(f"**Staffelprijzen:** {'📊 Ja' if answers.get('volume_pricing') else '💰 Nee'}")
-            st.markdown(f"**GS1 Sync:** {'🌐 Ja' if answers.get('gs1_sync') else '📋 Nee'}")
-            st.markdown(f"**Aantal zorginstellingen:** {len(answers.get('organizations', []))}")
+            st.markdown("\n\n".join([
+                f"**Staffelprijzen:** {'📊 Ja' if answers.get('volume_pricing') else '💰 Nee'}",
+                f"**GS1 Sync:** {'🌐 Ja' if answers.get('gs1_sync') else '📋 Nee'}",
+                f"**Aantal zorginstellingen:** {len(answers.get('organizations', []))}"
+            ]))
         
-        if answers.get('organizations'):
-            st.markdown("**Geselecteerde zorginstellingen:**")
-            for org in answers.get('organizations', [])[:10]:  # Toon eerste 10
-                st.markdown(f"- {org}")
-            if len(answers.get('organizations', [])) > 10:
-                st.markdown(f"- ... en {len(answers.get('organizations', [])) - 10} meer")
+        orgs = answers.get('organizations', [])
+        if orgs:
+            org_lines = [f"- {org}" for org in orgs[:10]]  # Toon eerste 10
+            if len(orgs) > 10:
+                org_lines.append(f"- ... en {len(orgs) - 10} meer")
+            st.markdown("**Geselecteerde zorginstellingen:**\n\n" + "\n".join(org_lines))
     
     # Template info
     if answers.get('template_choice') == 'custom':
+        # Start het genereren alvast, zodat de bytes klaarstaan bij het downloaden
+        prefetch_custom_template(answers)
+        
         hidden_fields = calculate_hidden_fields(answers)
         total_fields = 103
         visible_fields = total_fields - hidden_fields
@@ -616,15 +611,7 @@ def show_summary():
         with col2:
             if st.button("🔄 Opnieuw beginnen", use_container_width=True):
                 st.session_state.step = 'welcome'
-                st.session_state.answers = {
-                    'template_choice': None,
-                    'all_orderable': None,
-                    'product_type': None,
-                    'chemicals_present': None,
-                    'volume_pricing': None,
-                    'gs1_sync': None,
-                    'organizations': []
-                }
+                _reset_answers()
                 st.rerun()
     else:
         st.success("✅ U heeft gekozen voor de standaard template. Alle 103 kolommen zijn zichtbaar.")
@@ -640,63 +627,84 @@ def calculate_hidden_fields(answers):
     """
     Bereken hoeveel velden verborgen moeten worden op basis van de antwoorden.
     """
-    hidden_count = 0
-    
-    # Bestelbaarheid
-    if answers.get('all_orderable'):
-        hidden_count += 5  # Verberg bestelbaarheid-gerelateerde velden
-    
-    # Producttype
-    product_type = answers.get('product_type')
-    if product_type == 'Allemaal facilitair':
-        hidden_count += 15  # Verberg medische en lab velden
-    elif product_type == 'Allemaal medisch':
-        hidden_count += 12  # Verberg facilitaire en lab velden
-    elif product_type == 'Allemaal laboratorium':
-        hidden_count += 10  # Verberg facilitaire en medische velden
-    # Gemixte producten: geen velden verbergen
-    
-    # Chemicaliën
-    if not answers.get('chemicals_present'):
-        hidden_count += 8  # Verberg chemische veiligheidsvelden
-    
-    # Staffelprijzen
-    if not answers.get('volume_pricing'):
-        hidden_count += 6  # Verberg staffelprijs velden
-    
-    # GS1 Sync
-    if not answers.get('gs1_sync'):
-        hidden_count += 12  # Verberg GS1-specifieke velden
-    
-    # Zorginstellingen (vereenvoudigde logica)
-    orgs = answers.get('organizations', [])
-    if orgs and len(orgs) < 10:  # Als minder dan 10 instellingen geselecteerd
-        hidden_count += 5  # Verberg enkele algemene velden
-    
-    return min(hidden_count, 50)  # Maximaal 50 velden verbergen
+    return _hidden_fields(
+        bool(answers.get('all_orderable')),
+        answers.get('product_type'),
+        bool(answers.get('chemicals_present')),
+        bool(answers.get('volume_pricing')),
+        bool(answers.get('gs1_sync')),
+        len(answers.get('organizations', []))
+    )
+
+@lru_cache(maxsize=None)
+def _hidden_fields(all_orderable, product_type, chemicals_present, volume_pricing, gs1_sync, n_orgs):
+    """Aantal verborgen velden, alleen afhankelijk van de opgegeven antwoorden"""
+    hidden_count = (
+        HIDE_COUNTS['all_orderable'] * all_orderable
+        + PRODUCT_HIDE_COUNTS.get(product_type, 0)
+        + HIDE_COUNTS['no_chemicals'] * (not chemicals_present)
+        + HIDE_COUNTS['no_volume_pricing'] * (not volume_pricing)
+        + HIDE_COUNTS['no_gs1'] * (not gs1_sync)
+        + HIDE_COUNTS['few_organizations'] * (0 < n_orgs < 10)
+    )
+    return min(hidden_count, MAX_HIDDEN_FIELDS)
+
+@st.cache_resource
+def _base_workbook():
+    """Laad de basis template eenmalig; het lock beschermt het gedeelde workbook tussen sessies"""
+    # Pas hier importeren: alleen nodig wanneer een aangepaste template gegenereerd wordt
+    import openpyxl
+    return openpyxl.load_workbook(TEMPLATES_DIR / "template_full.xlsx"), threading.Lock()
+
+@st.cache_data(show_spinner=False)
+def build_custom_xlsx(all_orderable, product_type):
+    """Genereer aangepaste template als bytes, gecached per combinatie van antwoorden"""
+    wb, lock = _base_workbook()
+    ws = wb['PrijsTemplateSheet']
+    output = BytesIO()
+    
+    with lock:
+        # Alleen de hidden vlaggen van de hoofdsheet wijzigen; na het opslaan terugzetten.
+        # Bewust openpyxl en geen xlsxwriter: xlsxwriter kan geen bestaand bestand aanpassen
+        # en zou opmaak, formules en de overige sheets verliezen.
+        # Kolom bereiken kunnen gesplitst worden, dus de volledige dimensies bewaren
+        original_dimensions = {key: copy(dim) for key, dim in ws.column_dimensions.items()}
+        try:
+            customize_main_sheet(ws, get_columns_to_hide(all_orderable, product_type))
+            wb.save(output)
+        finally:
+            ws.column_dimensions.clear()
+            ws.column_dimensions.update(original_dimensions)
+    
+    return output.getvalue()
+
+@st.cache_resource
+def _build_executor():
+    """Gedeelde thread pool voor het vooraf genereren van aangepaste templates"""
+    return ThreadPoolExecutor(max_workers=2)
+
+def prefetch_custom_template(answers):
+    """Start het genereren op de achtergrond, eenmalig per combinatie van antwoorden"""
+    # Alleen de antwoorden die de kolomselectie bepalen vormen de key
+    key = (bool(answers['all_orderable']), answers['product_type'])
+    pending = st.session_state.get('pending_xlsx')
+    # Opnieuw starten bij andere antwoorden of wanneer de vorige poging faalde
+    failed = pending is not None and pending.done() and pending.exception() is not None
+    if st.session_state.get('pending_xlsx_key') != key or failed:
+        st.session_state.pending_xlsx = _build_executor().submit(build_custom_xlsx, *key)
+        st.session_state.pending_xlsx_key = key
+    return st.session_state.pending_xlsx
 
 def download_custom_template(answers):
     """Genereer en download aangepaste template"""
     try:
-        # Laad basis template
-        base_template = pd.ExcelFile(TEMPLATES_DIR / "template_full.xlsx")
-        
-        # Verwerk alle sheets
-        output = BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            for sheet_name in base_template.sheet_names:
-                df = base_template.parse(sheet_name)
-                
-                # Pas template aan
-                if sheet_name == 'PrijsTemplateSheet':
-                    df = customize_main_sheet(df, answers)
-                
-                df.to_excel(writer, sheet_name=sheet_name, index=False)
+        # Wacht op de (meestal al afgeronde) achtergrondtaak
+        data = prefetch_custom_template(answers).result()
         
         # Download
         st.download_button(
             label="💾 Download template",
-            data=output.getvalue(),
+            data=data,
             file_name="grx_template_custom.xlsx",
             mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         )
@@ -704,48 +712,98 @@ def download_custom_template(answers):
         st.success("✅ Template succesvol gegenereerd!")
         
     except Exception as e:
+        # Mislukte taak niet bewaren, zodat een volgende klik opnieuw genereert
+        st.session_state.pop('pending_xlsx', None)
+        st.session_state.pop('pending_xlsx_key', None)
         st.error(f"❌ Fout bij genereren template: {str(e)}")
 
-def customize_main_sheet(df, answers):
-    """Pas hoofdsheet aan gebaseerd op antwoorden"""
-    columns_to_hide = []
-    
-    # Bepaal te verbergen kolommen
-    if answers['all_orderable']:
-        columns_to_hide.extend(FIELD_MAPPING['orderable_related'])
-    
-    if answers['product_type'] == 'Allemaal facilitair':
-        columns_to_hide.extend(FIELD_MAPPING['medical_fields'])
-        columns_to_hide.extend(FIELD_MAPPING['lab_fields'])
-    elif answers['product_type'] == 'Allemaal medisch':
-        columns_to_hide.extend(FIELD_MAPPING['facility_fields'])
-        columns_to_hide.extend(FIELD_MAPPING['lab_fields'])
-    elif answers['product_type'] == 'Allemaal laboratorium':
-        columns_to_hide.extend(FIELD_MAPPING['facility_fields'])
-        columns_to_hide.extend(FIELD_MAPPING['medical_fields'])
-    
-    # Verberg kolommen (zet breedte op 0)
+@lru_cache(maxsize=None)
+def get_columns_to_hide(all_orderable, product_type):
+    """Bepaal welke kolommen verborgen moeten worden (eenmalig berekend per combinatie)"""
+    columns_to_hide = set()
+    
+    if all_orderable:
+        columns_to_hide.update(FIELD_MAPPING['orderable_related'])
+    
+    if product_type == 'Allemaal facilitair':
+        columns_to_hide.update(FIELD_MAPPING['medical_fields'])
+        columns_to_hide.update(FIELD_MAPPING['lab_fields'])
+    elif product_type == 'Allemaal medisch':
+        columns_to_hide.update(FIELD_MAPPING['facility_fields'])
+        columns_to_hide.update(FIELD_MAPPING['lab_fields'])
+    elif product_type == 'Allemaal laboratorium':
+        columns_to_hide.update(FIELD_MAPPING['facility_fields'])
+        columns_to_hide.update(FIELD_MAPPING['medical_fields'])
+    
+    # Behoud essentiële kolommen
+    columns_to_hide.difference_update(('DataTest', 'ID_Column'))
+    
+    return frozenset(columns_to_hide)
+
+def customize_main_sheet(ws, columns_to_hide):
+    """Verberg de opgegeven kolommen in de hoofdsheet"""
+    # Koppel kolomnamen (header rij) aan kolomnummers
+    header = {cell.value: cell.column for cell in ws[1]}
+    
+    # Verberg kolommen in Excel; de data zelf blijft behouden
     for col in columns_to_hide:
-        if col in df.columns:
-            # Markeer deze kolommen om later te verbergen in Excel
-            df[col] = df[col].astype(str)
-            if col not in ['DataTest', 'ID_Column']:  # Behoud essentiële kolommen
-                df[col] = ''
+        idx = header.get(col)
+        if idx:
+            _single_column_dimension(ws, idx).hidden = True
     
-    return df
+    return ws
+
+def _single_column_dimension(ws, idx):
+    """Dimensie voor precies kolom idx; een geladen <col min..max> bereik wordt eerst gesplitst"""
+    from openpyxl.utils import get_column_letter
+    
+    # openpyxl bewaart een bereik onder de letter van de eerste kolom; een losse
+    # dimensie daarbinnen zou een overlappende <col> geven, wat Excel als corrupt ziet
+    dims = ws.column_dimensions
+    for key, dim in list(dims.items()):
+        start, end = dim.min, dim.max
+        if start and end and start < end and start <= idx <= end:
+            del dims[key]
+            for part_start, part_end in ((start, idx - 1), (idx, idx), (idx + 1, end)):
+                if part_start <= part_end:
+                    part = copy(dim)
+                    part.index = get_column_letter(part_start)
+                    part.min, part.max = part_start, part_end
+                    dims[part.index] = part
+            break
+    
+    return dims[get_column_letter(idx)]
+
+@st.cache_resource
+def _full_template_bytes():
+    """Lees de volledige template eenmalig in (gedeeld tussen reruns en gebruikers)"""
+    return (TEMPLATES_DIR / "template_full.xlsx").read_bytes()
 
 def download_full_template():
     """Download volledige template"""
     try:
-        with open(TEMPLATES_DIR / "template_full.xlsx", "rb") as f:
-            st.download_button(
-                label="💾 Download volledige template",
-                data=f,
-                file_name="grx_template_full.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-            )
+        st.download_button(
+            label="💾 Download volledige template",
+            data=_full_template_bytes(),
+            file_name="grx_template_full.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+        )
     except FileNotFoundError:
         st.error("❌ Template bestand niet gevonden!")
 
+# Render functie per stap (na alle show_* definities)
+_STEP_RENDERERS = {
+    'welcome': show_welcome,
+    'template_choice': show_template_choice,
+    'question1': show_question1,
+    'question2': show_question2,
+    'question3': show_question3,
+    'question4': show_question4,
+    'question5': show_question5,
+    'question6': show_question6,
+    'question7': show_question7,
+    'summary': show_summary
+}
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,14 +7,10 @@ Streamlit app met GHX design voor template generatie.
 import streamlit as st
 import pandas as pd
 import json
+import re
 from pathlib import Path
 from datetime import datetime
-import tempfile
-import os
-
-# Voeg src toe aan path
-import sys
-sys.path.append('src')
+from io import BytesIO
 
 from src.context import Context
 from src.mapping import FieldMapping
@@ -30,7 +26,7 @@ st.set_page_config(
 )
 
 # GHX Custom CSS
-st.markdown("""
+GHX_CSS = """
 <style>
     /* GHX Brand Colors */
     :root {
@@ -152,7 +148,12 @@ st.markdown("""
     footer {visibility: hidden;}
     .stDeployButton {display:none;}
 </style>
-""", unsafe_allow_html=True)
+"""
+
+# Streamlit moet de CSS bij elke rerun opnieuw meesturen (anders verdwijnt de styling);
+# daarom eenmalig bij import comments en witruimte strippen om de payload klein te houden.
+GHX_CSS = re.sub(r"\s+", " ", re.sub(r"/\*.*?\*/", "", GHX_CSS, flags=re.S)).strip()
+st.markdown(GHX_CSS, unsafe_allow_html=True)
 
 def render_header():
     """Render GHX style header."""
@@ -184,15 +185,80 @@ def render_progress_steps(current_step):
     
     st.markdown(progress_html, unsafe_allow_html=True)
 
+# Voorbeeld contexts voor de sidebar
+SAMPLE_FILES = {
+    "GS1 Medisch": "tests/samples/sample_context_gs1.json",
+    "Lab Chemicaliën": "tests/samples/sample_context_lab_chemicals.json",
+    "Facilitair": "tests/samples/sample_context_facilitair.json",
+    "Staffel": "tests/samples/sample_context_staffel.json"
+}
+
+@st.cache_resource(show_spinner=False)
+def _cached_field_mapping():
+    """Laad field mapping eenmalig per proces (gedeeld tussen reruns en sessies)."""
+    mapping_path = Path("config/field_mapping.json")
+    return FieldMapping.from_file(mapping_path)
+
 def load_field_mapping():
     """Laad field mapping."""
     try:
-        mapping_path = Path("config/field_mapping.json")
-        return FieldMapping.from_file(mapping_path)
+        return _cached_field_mapping()
     except Exception as e:
         st.error(f"Kan field mapping niet laden: {e}")
         return None
 
+@st.cache_data(show_spinner=False)
+def load_sample(path, mtime):
+    """Laad een voorbeeld context (gecached per pad en wijzigingstijd)."""
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+def context_key(context_dict):
+    """Maak een hashbare, volgorde-onafhankelijke key van een context dictionary."""
+    return tuple(
+        (key, tuple(value) if isinstance(value, list) else value)
+        for key, value in sorted(context_dict.items())
+    )
+
+@st.cache_data(show_spinner=False)
+def compute_preview(context_items):
+    """
+    Bereken de afgeleide context waarden voor de preview (gecached per context).
+    
+    Returns:
+        Tuple van (gesorteerde labels, preset code, template basename, validatie fouten)
+    """
+    context = Context(**dict(context_items))
+    return (
+        sorted(context.labels()),
+        context.get_preset_code(),
+        context.get_template_basename(),
+        context.validate()
+    )
+
+@st.cache_data(show_spinner=False)
+def context_json(context_items):
+    """Geef de context als geformatteerde JSON string (gecached per context)."""
+    return json.dumps(dict(context_items), indent=2, ensure_ascii=False)
+
+def build_decisions_dataframe(decisions):
+    """Bouw het overzicht van veld beslissingen kolom voor kolom op."""
+    return pd.DataFrame({
+        "Veld": [d.field_name for d in decisions],
+        "Kolom": [d.column for d in decisions],
+        "Zichtbaar": ["✅" if d.visible else "❌" for d in decisions],
+        "Verplicht": ["⚠️" if d.mandatory else "" for d in decisions],
+        "Dependencies": ["✅" if d.dependency_satisfied else "❌" for d in decisions],
+        "Notes": [d.notes[:50] + "..." if len(d.notes) > 50 else d.notes for d in decisions]
+    })
+
+def section_card(heading):
+    """Render de GHX card chrome en sectie kop in één markdown element."""
+    st.markdown(f'<div class="section-card"></div>\n\n{heading}', unsafe_allow_html=True)
+
+def message_box(css_class, body):
+    """Render een gestylede melding (markdown inhoud) in één markdown element."""
+    st.markdown(f'<div class="{css_class}">\n\n{body}\n\n</div>', unsafe_allow_html=True)
+
 def main():
     """Main app functie."""
     
@@ -204,8 +270,8 @@ def main():
         st.session_state.step = 1
     if 'context' not in st.session_state:
         st.session_state.context = None
-    if 'generated_file' not in st.session_state:
-        st.session_state.generated_file = None
+    if 'generated_bytes' not in st.session_state:
+        st.session_state.generated_bytes = None
     
     # Progress steps
     render_progress_steps(st.session_state.step)
@@ -218,7 +284,7 @@ def main():
         if st.button("🔄 Opnieuw beginnen"):
             st.session_state.step = 1
             st.session_state.context = None
-            st.session_state.generated_file = None
+            st.session_state.generated_bytes = None
             st.rerun()
         
         st.markdown("---")
@@ -240,20 +306,12 @@ def main():
         
         # Sample contexts
         st.markdown("### 📁 Voorbeelden")
-        sample_files = {
-            "GS1 Medisch": "tests/samples/sample_context_gs1.json",
-            "Lab Chemicaliën": "tests/samples/sample_context_lab_chemicals.json", 
-            "Facilitair": "tests/samples/sample_context_facilitair.json",
-            "Staffel": "tests/samples/sample_context_staffel.json"
-        }
-        
-        selected_sample = st.selectbox("Laad voorbeeld:", ["Selecteer..."] + list(sample_files.keys()))
+        selected_sample = st.selectbox("Laad voorbeeld:", ["Selecteer..."] + list(SAMPLE_FILES.keys()))
         
         if selected_sample != "Selecteer..." and st.button("📥 Laad voorbeeld"):
             try:
-                sample_path = Path(sample_files[selected_sample])
-                with open(sample_path) as f:
-                    sample_data = json.load(f)
+                sample_path = Path(SAMPLE_FILES[selected_sample])
+                sample_data = load_sample(str(sample_path), sample_path.stat().st_mtime)
                 st.session_state.sample_data = sample_data
                 st.success(f"Voorbeeld '{selected_sample}' geladen!")
                 st.rerun()
@@ -270,8 +328,7 @@ def main():
 
 def render_context_configuration():
     """Render context configuration step."""
-    st.markdown('<div class="section-card">', unsafe_allow_html=True)
-    st.markdown("## 🎯 Stap 1: Context Configuratie")
+    section_card("## 🎯 Stap 1: Context Configuratie")
     
     col1, col2 = st.columns(2)
     
@@ -327,11 +384,8 @@ def render_context_configuration():
         
         institutions = [inst.strip() for inst in institutions_text.split('\n') if inst.strip()]
     
-    st.markdown('</div>', unsafe_allow_html=True)
-    
     # Preview context
-    st.markdown('<div class="section-card">', unsafe_allow_html=True)
-    st.markdown("### 👀 Context Preview")
+    section_card("### 👀 Context Preview")
     
     context_dict = {
         "template_choice": template_choice,
@@ -345,37 +399,38 @@ def render_context_configuration():
     }
     
     try:
-        context = Context(**context_dict)
+        # Hergebruik het Context object zolang de invoer niet verandert
+        key = context_key(context_dict)
+        if st.session_state.get('preview_context_key') != key:
+            st.session_state.preview_context = Context(**context_dict)
+            st.session_state.preview_context_key = key
+        context = st.session_state.preview_context
+        labels, preset_code, template_basename, errors = compute_preview(key)
         
         col1, col2 = st.columns(2)
         
         with col1:
-            st.json(context_dict)
+            with st.expander("Bekijk JSON", expanded=False):
+                st.code(context_json(key), language="json")
         
         with col2:
             st.markdown("**Gegenereerde labels:**")
-            labels = sorted(context.labels())
             for label in labels:
                 st.markdown(f"- `{label}`")
             
-            st.markdown(f"**Preset code:** `{context.get_preset_code()}`")
-            st.markdown(f"**Template:** `{context.get_template_basename()}.xlsx`")
+            st.markdown(f"**Preset code:** `{preset_code}`")
+            st.markdown(f"**Template:** `{template_basename}.xlsx`")
         
         # Validation
-        errors = context.validate()
         if errors:
-            st.markdown('<div class="error-message">', unsafe_allow_html=True)
-            st.markdown("**⚠️ Validatie fouten:**")
-            for error in errors:
-                st.markdown(f"- {error}")
-            st.markdown('</div>', unsafe_allow_html=True)
+            error_lines = "\n".join(f"- {error}" for error in errors)
+            message_box("error-message", f"**⚠️ Validatie fouten:**\n\n{error_lines}")
         else:
-            st.markdown('<div class="success-message">', unsafe_allow_html=True)
-            st.markdown("✅ **Context is geldig!**")
-            st.markdown('</div>', unsafe_allow_html=True)
+            message_box("success-message", "✅ **Context is geldig!**")
             
-            # Store context
+            # Store context (met gesorteerde labels voor stap 2 en 3)
             st.session_state.context = context
+            st.session_state.sorted_labels = labels
             
             # Next step button
             if st.button("➡️ Ga naar Template Generatie", type="primary"):
@@ -385,16 +440,13 @@ def render_context_configuration():
     except Exception as e:
         st.error(f"Context validatie fout: {e}")
     
-    st.markdown('</div>', unsafe_allow_html=True)
-    
     # Clear sample data after use
     if 'sample_data' in st.session_state:
         del st.session_state.sample_data
 
 def render_template_generation():
     """Render template generation step."""
-    st.markdown('<div class="section-card">', unsafe_allow_html=True)
-    st.markdown("## ⚙️ Stap 2: Template Generatie")
+    section_card("## ⚙️ Stap 2: Template Generatie")
     
     if not st.session_state.context:
         st.error("Geen geldige context gevonden. Ga terug naar stap 1.")
@@ -404,14 +456,15 @@ def render_template_generation():
         return
     
     context = st.session_state.context
+    _, preset_code, template_basename, _ = compute_preview(context_key(context.to_dict()))
     
     # Show context summary
     col1, col2 = st.columns(2)
     
     with col1:
         st.markdown("### 📋 Configuratie Samenvatting")
-        st.markdown(f"**Template:** {context.get_template_basename()}")
-        st.markdown(f"**Preset Code:** {context.get_preset_code()}")
+        st.markdown(f"**Template:** {template_basename}")
+        st.markdown(f"**Preset Code:** {preset_code}")
         st.markdown(f"**Product Type:** {context.product_type}")
         st.markdown(f"**GS1 Modus:** {context.gs1_mode}")
         st.markdown(f"**Instellingen:** {', '.join(context.institutions) if context.institutions else 'Geen'}")
@@ -421,11 +474,8 @@ def render_template_generation():
         mandatory_color = st.color_picker("Verplichte velden kleur:", "#FFF2CC")
         hidden_color = st.color_picker("Verborgen velden kleur:", "#EEEEEE")
     
-    st.markdown('</div>', unsafe_allow_html=True)
-    
     # Generate template
-    st.markdown('<div class="section-card">', unsafe_allow_html=True)
-    st.markdown("### 🔧 Template Genereren")
+    section_card("### 🔧 Template Genereren")
     
     if st.button("🚀 Genereer Template", type="primary"):
         try:
@@ -441,14 +491,13 @@ def render_template_generation():
                 decisions = engine.process_all_fields()
                 
                 # Show decisions summary
-                visible_count = sum(1 for d in decisions if d.visible)
-                mandatory_count = sum(1 for d in decisions if d.visible and d.mandatory)
+                visible_count, mandatory_count = engine.count_decisions(decisions)
                 
                 st.success(f"✅ Beslissingen berekend: {len(decisions)} velden, {visible_count} zichtbaar, {mandatory_count} verplicht")
                 
                 # Find template file
                 templates_dir = Path("templates")
-                template_name = f"{context.get_template_basename()}.xlsx"
+                template_name = f"{template_basename}.xlsx"
                 template_path = templates_dir / template_name
                 
                 if not template_path.exists():
@@ -458,42 +507,29 @@ def render_template_generation():
                 # Generate template
                 excel_processor = ExcelProcessor(mandatory_color, hidden_color)
                 
-                # Use temporary file
-                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-                temp_path = Path(temp_file.name)
-                temp_file.close()
+                # Genereer direct in geheugen
+                output = BytesIO()
                 
                 context_dict = context.to_dict()
-                context_dict["_labels"] = list(context.labels())
+                context_dict["_labels"] = list(st.session_state.sorted_labels)
                 
                 excel_processor.process_template(
                     template_path,
-                    temp_path,
+                    output,
                     decisions,
                     context_dict,
                     "Template NL"
                 )
                 
                 # Store generated file
-                st.session_state.generated_file = temp_path
+                st.session_state.generated_bytes = output.getvalue()
+                st.session_state.generated_at = datetime.now()
                 
-                st.markdown('<div class="success-message">', unsafe_allow_html=True)
-                st.markdown("🎉 **Template succesvol gegenereerd!**")
-                st.markdown('</div>', unsafe_allow_html=True)
+                message_box("success-message", "🎉 **Template succesvol gegenereerd!**")
                 
                 # Show field decisions
                 with st.expander("📊 Veld Beslissingen Details"):
-                    decisions_df = pd.DataFrame([
-                        {
-                            "Veld": d.field_name,
-                            "Kolom": d.column,
-                            "Zichtbaar": "✅" if d.visible else "❌",
-                            "Verplicht": "⚠️" if d.mandatory else "",
-                            "Dependencies": "✅" if d.dependency_satisfied else "❌" if d.depends_on else "",
-                            "Notes": d.notes[:50] + "..." if len(d.notes) > 50 else d.notes
-                        }
-                        for d in decisions
-                    ])
+                    decisions_df = build_decisions_dataframe(decisions)
                     
                     st.dataframe(
                         decisions_df,
@@ -507,11 +543,7 @@ def render_template_generation():
                     st.rerun()
                 
         except Exception as e:
-            st.markdown('<div class="error-message">', unsafe_allow_html=True)
-            st.markdown(f"**❌ Fout bij genereren:** {e}")
-            st.markdown('</div>', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+            message_box("error-message", f"**❌ Fout bij genereren:** {e}")
     
     # Back button
     if st.button("⬅️ Terug naar configuratie"):
@@ -520,10 +552,9 @@ def render_template_generation():
 
 def render_download_results():
     """Render download results step."""
-    st.markdown('<div class="section-card">', unsafe_allow_html=True)
-    st.markdown("## 📥 Stap 3: Download Resultaat")
+    section_card("## 📥 Stap 3: Download Resultaat")
     
-    if not st.session_state.generated_file or not Path(st.session_state.generated_file).exists():
+    if not st.session_state.generated_bytes:
         st.error("Geen gegenereerd template gevonden. Ga terug naar stap 2.")
         if st.button("⬅️ Terug naar generatie"):
             st.session_state.step = 2
@@ -531,10 +562,11 @@ def render_download_results():
         return
     
     context = st.session_state.context
-    file_path = Path(st.session_state.generated_file)
+    file_data = st.session_state.generated_bytes
+    generated_at = st.session_state.generated_at
     
     # File info
-    file_size = file_path.stat().st_size / 1024  # KB
+    file_size = len(file_data) / 1024  # KB
     
     col1, col2 = st.columns(2)
     
@@ -543,19 +575,15 @@ def render_download_results():
         st.markdown(f"**Preset Code:** {context.get_preset_code()}")
         st.markdown(f"**Template Type:** {context.get_template_basename()}")
         st.markdown(f"**Bestandsgrootte:** {file_size:.1f} KB")
-        st.markdown(f"**Gegenereerd:** {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        st.markdown(f"**Gegenereerd:** {generated_at:%Y-%m-%d %H:%M:%S}")
     
     with col2:
         st.markdown("### 🎯 Context Labels")
-        labels = sorted(context.labels())
-        for label in labels:
+        for label in st.session_state.sorted_labels:
             st.markdown(f"- `{label}`")
     
     # Download button
-    with open(file_path, "rb") as file:
-        file_data = file.read()
-    
-    filename = f"GHX_Template_{context.get_preset_code()}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
+    filename = f"GHX_Template_{context.get_preset_code()}_{generated_at:%Y%m%d_%H%M%S}.xlsx"
     
     st.download_button(
         label="📥 Download Template",
@@ -565,27 +593,19 @@ def render_download_results():
         type="primary"
     )
     
-    st.markdown('<div class="success-message">', unsafe_allow_html=True)
-    st.markdown("✅ **Template klaar voor download!**")
-    st.markdown("Het template bevat embedded metadata voor traceability.")
-    st.markdown('</div>', unsafe_allow_html=True)
-    
-    st.markdown('</div>', unsafe_allow_html=True)
+    message_box(
+        "success-message",
+        "✅ **Template klaar voor download!**\n\nHet template bevat embedded metadata voor traceability."
+    )
     
     # Actions
     col1, col2 = st.columns(2)
     
     with col1:
         if st.button("🔄 Nieuwe Template Maken"):
-            # Cleanup temp file
-            try:
-                os.unlink(file_path)
-            except:
-                pass
-            
             st.session_state.step = 1
             st.session_state.context = None
-            st.session_state.generated_file = None
+            st.session_state.generated_bytes = None
             st.rerun()
     
     with col2:
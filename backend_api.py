@@ -6,15 +6,17 @@ Verbindt het HTML frontend met de Python template generator modules.
 
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
-import tempfile
+import io
 import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
 from pathlib import Path
+from functools import lru_cache
 import json
 
 # Import onze generator modules
-import sys
-sys.path.append('src')
-
 from src.context import Context
 from src.mapping import FieldMapping
 from src.engine import TemplateEngine
@@ -23,20 +25,60 @@ from src.excel import ExcelProcessor
 app = Flask(__name__)
 CORS(app)  # Allow cross-origin requests from HTML
 
+# Optionele snellere JSON serialisatie via orjson
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    
+    class OrjsonProvider(DefaultJSONProvider):
+        """JSON provider die responses met orjson serialiseert."""
+        
+        def dumps(self, obj, **kwargs):
+            return orjson.dumps(
+                obj,
+                default=self.default,
+                option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+            ).decode()
+    
+    app.json = OrjsonProvider(app)
+except ImportError:
+    pass
+
+# Optionele gzip compressie van JSON responses
+try:
+    from flask_compress import Compress
+    Compress(app)
+except ImportError:
+    pass
+
 # Global variabelen
-field_mapping = None
-temp_files = {}  # Track temporary files
+MAX_GENERATED_FILES = 32  # Maximaal aantal gegenereerde templates in geheugen
+GENERATED_FILE_TTL = 3600  # Seconden dat een gegenereerd template downloadbaar blijft
+generated_files = OrderedDict()  # file_id -> bestand info, oudste eerst
+generated_files_lock = threading.Lock()
+
+def prune_generated_files():
+    """
+    Verwijder verlopen en overtollige gegenereerde bestanden.
+    
+    Moet aangeroepen worden met generated_files_lock vastgehouden.
+    """
+    cutoff = time.monotonic() - GENERATED_FILE_TTL
+    while generated_files:
+        oldest = next(iter(generated_files.values()))
+        if len(generated_files) <= MAX_GENERATED_FILES and oldest['created'] >= cutoff:
+            break
+        generated_files.popitem(last=False)
 
+@lru_cache(maxsize=1)
 def load_field_mapping():
-    """Laad field mapping eenmalig bij startup."""
-    global field_mapping
-    try:
-        mapping_path = Path("config/field_mapping.json")
-        field_mapping = FieldMapping.from_file(mapping_path)
-        print(f"✅ Field mapping geladen: {len(field_mapping.get_all_fields())} velden")
-    except Exception as e:
-        print(f"❌ Kan field mapping niet laden: {e}")
-        field_mapping = None
+    """
+    Laad field mapping eenmalig (lazy) en hergebruik daarna.
+    
+    Fouten worden niet gecached: een volgende aanroep probeert opnieuw te laden.
+    """
+    mapping_path = Path("config/field_mapping.json")
+    return FieldMapping.from_file(mapping_path)
 
 @app.route('/api/validate-context', methods=['POST'])
 def validate_context():
@@ -80,8 +122,10 @@ def generate_template():
     try:
         context_data = request.json
         
-        if not field_mapping:
-            return jsonify({'error': 'Field mapping niet geladen'}), 500
+        try:
+            field_mapping = load_field_mapping()
+        except Exception as e:
+            return jsonify({'error': f'Field mapping niet geladen: {e}'}), 500
         
         # Maak context
         context = Context(**context_data)
@@ -95,8 +139,7 @@ def generate_template():
         decisions = engine.process_all_fields()
         
         # Statistieken
-        visible_count = sum(1 for d in decisions if d.visible)
-        mandatory_count = sum(1 for d in decisions if d.visible and d.mandatory)
+        visible_count, mandatory_count = engine.count_decisions(decisions)
         
         # Vind template bestand
         templates_dir = Path("templates")
@@ -106,43 +149,44 @@ def generate_template():
         if not template_path.exists():
             return jsonify({'error': f'Template bestand niet gevonden: {template_path}'}), 404
         
-        # Maak temporary output bestand
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
-        temp_path = Path(temp_file.name)
-        temp_file.close()
-        
-        # Genereer template
+        # Genereer template in geheugen
+        output = io.BytesIO()
         excel_processor = ExcelProcessor()
         context_dict = context.to_dict()
         context_dict["_labels"] = list(context.labels())
         
         excel_processor.process_template(
             template_path,
-            temp_path,
+            output,
             decisions,
             context_dict,
             "Template NL"  # GHX templates gebruiken "Template NL"
         )
+        file_data = output.getvalue()
         
-        # Bewaar bestand info voor download
-        file_id = os.path.basename(temp_path)
-        temp_files[file_id] = {
-            'path': temp_path,
-            'filename': f"GHX_Template_{context.get_preset_code()}_{context_data.get('timestamp', 'generated')}.xlsx",
-            'context': context_dict
-        }
+        # Bewaar bestand info voor download; ruim verlopen en overtollige bestanden op
+        file_id = uuid.uuid4().hex
+        filename = f"GHX_Template_{context.get_preset_code()}_{context_data.get('timestamp', 'generated')}.xlsx"
+        with generated_files_lock:
+            generated_files[file_id] = {
+                'data': file_data,
+                'filename': filename,
+                'context': context_dict,
+                'created': time.monotonic()
+            }
+            prune_generated_files()
         
         return jsonify({
             'success': True,
             'file_id': file_id,
-            'filename': temp_files[file_id]['filename'],
+            'filename': filename,
             'stats': {
                 'total_fields': len(decisions),
                 'visible_fields': visible_count,
                 'mandatory_fields': mandatory_count
             },
             'preset_code': context.get_preset_code(),
-            'file_size_kb': round(temp_path.stat().st_size / 1024, 1)
+            'file_size_kb': round(len(file_data) / 1024, 1)
         })
         
     except Exception as e:
@@ -152,18 +196,17 @@ def generate_template():
 def download_template(file_id):
     """Download gegenereerd template bestand."""
     try:
-        if file_id not in temp_files:
+        with generated_files_lock:
+            prune_generated_files()
+            file_info = generated_files.get(file_id)
+        
+        if file_info is None:
             return jsonify({'error': 'Bestand niet gevonden'}), 404
         
-        file_info = temp_files[file_id]
-        file_path = file_info['path']
         filename = file_info['filename']
         
-        if not file_path.exists():
-            return jsonify({'error': 'Bestand bestaat niet meer'}), 404
-        
         return send_file(
-            file_path,
+            io.BytesIO(file_info['data']),
             as_attachment=True,
             download_name=filename,
             mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
@@ -175,33 +218,32 @@ def download_template(file_id):
 @app.route('/api/info')
 def api_info():
     """API informatie."""
+    try:
+        field_mapping = load_field_mapping()
+    except Exception:
+        field_mapping = None
+    
     return jsonify({
         'name': 'GHX Template Generator API',
         'version': '1.0.0',
         'field_mapping_loaded': field_mapping is not None,
         'field_count': len(field_mapping.get_all_fields()) if field_mapping else 0,
-        'temp_files': len(temp_files)
+        'temp_files': len(generated_files)
     })
 
 @app.route('/api/cleanup', methods=['POST'])
 def cleanup_temp_files():
-    """Ruim temporary bestanden op."""
+    """Ruim gegenereerde bestanden op."""
     try:
-        cleaned = 0
-        for file_id, file_info in list(temp_files.items()):
-            try:
-                file_path = file_info['path']
-                if file_path.exists():
-                    os.unlink(file_path)
-                del temp_files[file_id]
-                cleaned += 1
-            except:
-                pass
+        with generated_files_lock:
+            cleaned = len(generated_files)
+            generated_files.clear()
+            remaining = len(generated_files)
         
         return jsonify({
             'success': True,
             'cleaned_files': cleaned,
-            'remaining_files': len(temp_files)
+            'remaining_files': remaining
         })
         
     except Exception as e:
@@ -219,10 +261,12 @@ def internal_error(error):
 if __name__ == '__main__':
     print("🚀 GHX Template Generator API wordt gestart...")
     
-    # Laad field mapping bij startup
-    load_field_mapping()
-    
-    if not field_mapping:
+    # Laad field mapping bij startup (daarna gecached)
+    try:
+        field_mapping = load_field_mapping()
+        print(f"✅ Field mapping geladen: {len(field_mapping.get_all_fields())} velden")
+    except Exception as e:
+        print(f"❌ Kan field mapping niet laden: {e}")
         print("❌ WAARSCHUWING: Field mapping niet geladen! API werkt niet correct.")
     
     print("📡 API endpoints beschikbaar:")
@@ -230,11 +274,18 @@ if __name__ == '__main__':
     print("   POST /api/generate-template - Genereer template")
     print("   GET  /api/download/<file_id> - Download template")
     print("   GET  /api/info - API informatie")
-    print("   POST /api/cleanup - Ruim temp bestanden op")
+    print("   POST /api/cleanup - Ruim gegenereerde bestanden op")
     
-    # Start Flask server
-    app.run(
-        host='127.0.0.1',
-        port=5000,
-        debug=True
-    )
+    # Start server: waitress indien beschikbaar, anders de Flask development server
+    try:
+        from waitress import serve
+        print("🖥️ Server: waitress (8 threads)")
+        serve(app, host='127.0.0.1', port=5000, threads=8)
+    except ImportError:
+        print("⚠️ waitress niet beschikbaar, gebruik Flask development server")
+        app.run(
+            host='127.0.0.1',
+            port=5000,
+            debug=os.environ.get('GHX_API_DEBUG') == '1',
+            threaded=True
+        )
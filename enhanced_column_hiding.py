@@ -7,10 +7,12 @@ methodes test om kolommen permanent te verbergen in Excel bestanden.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Sequence
 from enum import Enum
+from copy import copy
 import json
 from openpyxl import load_workbook, Workbook
+from openpyxl.utils import column_index_from_string
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.styles import PatternFill
 
@@ -25,14 +27,51 @@ class HideMethod(Enum):
     ALL_METHODS = "all_methods"
 
 
+# Kolom dimensie attributen per methode, in toepassingsvolgorde
+METHOD_ATTRIBUTES = {
+    HideMethod.HIDDEN_ONLY: (("hidden", True),),
+    HideMethod.WIDTH_ZERO: (("width", 0),),
+    HideMethod.COMBINED: (("hidden", True), ("width", 0)),
+    HideMethod.CONTENT_CLEAR: (),
+    HideMethod.OUTLINE_COLLAPSE: (("hidden", True), ("outline_level", 1), ("collapsed", True)),
+    # Combineer alle methodes voor maximale compatibiliteit
+    HideMethod.ALL_METHODS: (("hidden", True), ("width", 0), ("outline_level", 1), ("collapsed", True)),
+}
+
+
+def hide_columns_fast(worksheet: Worksheet, columns_to_hide: Sequence[str] = ("AA", "AB")) -> List[str]:
+    """
+    Verberg kolommen met ALL_METHODS zonder resultaat administratie.
+    
+    Snelle variant van ColumnHider.hide_columns voor de template generatie, waar
+    alleen het verbergen telt (standaard de vaste kolommen AA en AB).
+    
+    Args:
+        worksheet: Excel worksheet object
+        columns_to_hide: Kolom letters om te verbergen
+        
+    Returns:
+        Foutmeldingen per mislukte kolom, in hetzelfde formaat als
+        ColumnHider.hide_columns (leeg als alles gelukt is)
+    """
+    attributes = METHOD_ATTRIBUTES[HideMethod.ALL_METHODS]
+    errors = []
+    for column in columns_to_hide:
+        try:
+            # Zelfde validatie als ColumnHider: een ongeldige letter maakt anders een losse dimensie aan
+            column_index_from_string(column)
+            cd = worksheet.column_dimensions[column]
+            for name, value in attributes:
+                setattr(cd, name, value)
+        except Exception as e:
+            errors.append(f"Kolom {column}: {str(e)}")
+    return errors
+
 class ColumnHider:
     """
     Klasse voor het verbergen van Excel kolommen met verschillende methodes.
     """
     
-    def __init__(self):
-        self.test_results = {}
-    
     def hide_columns(self, 
                     worksheet: Worksheet, 
                     columns_to_hide: List[str],
@@ -57,9 +96,15 @@ class ColumnHider:
             'success_count': 0
         }
         
+        # Bepaal de wis-grens eenmalig voor alle kolommen (worksheet.max_row loopt alle cellen af)
+        clear_max_row = None
+        if clear_content or method == HideMethod.CONTENT_CLEAR:
+            clear_max_row = min(worksheet.max_row, 1000)  # Limiteer voor performance
+        
         for col in columns_to_hide:
             try:
-                col_result = self._apply_hide_method(worksheet, col, method, clear_content)
+                col_idx = column_index_from_string(col)
+                col_result = self._apply_hide_method(worksheet, col, col_idx, method, clear_max_row)
                 results['columns_processed'].append({
                     'column': col,
                     'success': col_result['success'],
@@ -79,16 +124,18 @@ class ColumnHider:
     def _apply_hide_method(self, 
                           worksheet: Worksheet, 
                           column: str, 
+                          col_idx: int,
                           method: HideMethod,
-                          clear_content: bool) -> Dict[str, Any]:
+                          clear_max_row: Optional[int]) -> Dict[str, Any]:
         """
         Pas specifieke verstop-methode toe op één kolom.
         
         Args:
             worksheet: Excel worksheet
             column: Kolom letter
+            col_idx: Kolom index (1-based) van dezelfde kolom
             method: Verstop methode
-            clear_content: Of inhoud gewist moet worden
+            clear_max_row: Laatste rij om te wissen, of None als er niet gewist wordt
             
         Returns:
             Resultaat dictionary
@@ -97,47 +144,21 @@ class ColumnHider:
         success = True
         
         # Haal header tekst op voor logging
-        try:
-            header_cell = worksheet[f"{column}1"]
-            header_text = header_cell.value or "Geen header"
-        except:
-            header_text = "Onbekend"
+        header_text = worksheet.cell(row=1, column=col_idx).value or "Geen header"
         
         try:
-            if method == HideMethod.HIDDEN_ONLY:
-                worksheet.column_dimensions[column].hidden = True
-                actions_taken.append("hidden = True")
-                
-            elif method == HideMethod.WIDTH_ZERO:
-                worksheet.column_dimensions[column].width = 0
-                actions_taken.append("width = 0")
-                
-            elif method == HideMethod.COMBINED:
-                worksheet.column_dimensions[column].hidden = True
-                worksheet.column_dimensions[column].width = 0
-                actions_taken.extend(["hidden = True", "width = 0"])
-                
-            elif method == HideMethod.OUTLINE_COLLAPSE:
-                worksheet.column_dimensions[column].hidden = True
-                worksheet.column_dimensions[column].outline_level = 1
-                worksheet.column_dimensions[column].collapsed = True
-                actions_taken.extend(["hidden = True", "outline_level = 1", "collapsed = True"])
-                
-            elif method == HideMethod.ALL_METHODS:
-                # Combineer alle methodes voor maximale compatibiliteit
-                worksheet.column_dimensions[column].hidden = True
-                worksheet.column_dimensions[column].width = 0
-                worksheet.column_dimensions[column].outline_level = 1
-                try:
-                    worksheet.column_dimensions[column].collapsed = True
-                    actions_taken.append("collapsed = True")
-                except:
-                    pass  # Collapsed werkt niet altijd
-                actions_taken.extend(["hidden = True", "width = 0", "outline_level = 1"])
+            # Pas kolom dimensie attributen toe; CONTENT_CLEAR laat de dimensie ongemoeid
+            # (opvragen maakt een nieuwe dimensie aan met standaard breedte)
+            attributes = METHOD_ATTRIBUTES[method]
+            if attributes:
+                cd = worksheet.column_dimensions[column]
+                for name, value in attributes:
+                    setattr(cd, name, value)
+                    actions_taken.append(f"{name} = {value}")
             
             # Content clearing (optioneel)
-            if clear_content or method == HideMethod.CONTENT_CLEAR:
-                cleared_cells = self._clear_column_content(worksheet, column)
+            if clear_max_row is not None:
+                cleared_cells = self._clear_column_content(worksheet, col_idx, clear_max_row)
                 actions_taken.append(f"cleared {cleared_cells} cells")
                 
         except Exception as e:
@@ -150,28 +171,27 @@ class ColumnHider:
             'header': header_text
         }
     
-    def _clear_column_content(self, worksheet: Worksheet, column: str) -> int:
+    def _clear_column_content(self, worksheet: Worksheet, col_idx: int, max_row: int) -> int:
         """
         Wis inhoud van alle cellen in een kolom.
         
         Args:
             worksheet: Excel worksheet
-            column: Kolom letter
+            col_idx: Kolom index (1-based)
+            max_row: Laatste rij om te wissen
             
         Returns:
             Aantal gewiste cellen
         """
         cleared_count = 0
-        max_row = min(worksheet.max_row, 1000)  # Limiteer voor performance
         
+        # Zoek direct in de cel opslag: lege rijen krijgen zo geen nieuwe Cell objecten
+        cells = worksheet._cells
         for row in range(1, max_row + 1):
-            try:
-                cell = worksheet[f"{column}{row}"]
-                if cell.value is not None:
-                    cell.value = None
-                    cleared_count += 1
-            except:
-                continue
+            cell = cells.get((row, col_idx))
+            if cell is not None and cell.value is not None:
+                cell.value = None
+                cleared_count += 1
                 
         return cleared_count
     
@@ -199,12 +219,15 @@ class ColumnHider:
         }
         
         # Test elke methode
+        total_cols = len(columns_to_hide)
+        wb = None
         for method in HideMethod:
             print(f"Testing methode: {method.value}")
             
             try:
-                # Laad fresh copy voor elke test
-                wb = load_workbook(input_file)
+                # Laad workbook eenmalig; na elke test worden de geteste kolommen hersteld
+                if wb is None:
+                    wb = load_workbook(input_file)
                 
                 if sheet_name not in wb.sheetnames:
                     test_results['methods_tested'][method.value] = {
@@ -213,16 +236,21 @@ class ColumnHider:
                     continue
                 
                 ws = wb[sheet_name]
+                snapshot = self._snapshot_columns(ws, columns_to_hide)
                 
-                # Pas methode toe
-                result = self.hide_columns(ws, columns_to_hide, method)
-                
-                # Sla test bestand op
-                output_file = Path(f"out/test_hide_{method.value}.xlsx")
-                output_file.parent.mkdir(exist_ok=True)
-                wb.save(output_file)
+                try:
+                    # Pas methode toe
+                    result = self.hide_columns(ws, columns_to_hide, method)
+                    
+                    # Sla test bestand op
+                    output_file = Path(f"out/test_hide_{method.value}.xlsx")
+                    output_file.parent.mkdir(exist_ok=True)
+                    wb.save(output_file)
+                finally:
+                    self._restore_columns(ws, snapshot)
                 
                 result['output_file'] = str(output_file)
+                result['success_rate'] = result['success_count'] / total_cols if total_cols > 0 else 0
                 test_results['methods_tested'][method.value] = result
                 
                 print(f"  ✅ {method.value}: {result['success_count']}/{len(columns_to_hide)} kolommen verborgen")
@@ -238,28 +266,82 @@ class ColumnHider:
         
         return test_results
     
+    def _snapshot_columns(self, worksheet: Worksheet, columns: List[str]) -> Dict[str, Any]:
+        """
+        Leg kolom dimensies en cel waarden vast zodat een test teruggedraaid kan worden.
+        
+        Args:
+            worksheet: Excel worksheet
+            columns: Kolom letters
+            
+        Returns:
+            Snapshot voor _restore_columns
+        """
+        indexes = {column_index_from_string(column) for column in columns}
+        return {
+            'dimensions': {
+                column: copy(worksheet.column_dimensions[column])
+                if column in worksheet.column_dimensions else None
+                for column in columns
+            },
+            'indexes': indexes,
+            'cells': {key: cell.value for key, cell in worksheet._cells.items() if key[1] in indexes},
+            # Worden bij opslaan bijgewerkt naar het hoogste outline niveau
+            'max_outline': worksheet.column_dimensions.max_outline,
+            'outline_level_col': worksheet.sheet_format.outlineLevelCol
+        }
+    
+    def _restore_columns(self, worksheet: Worksheet, snapshot: Dict[str, Any]) -> None:
+        """
+        Herstel kolommen naar de staat van een eerder gemaakte snapshot.
+        
+        Args:
+            worksheet: Excel worksheet
+            snapshot: Resultaat van _snapshot_columns
+        """
+        for column, dimension in snapshot['dimensions'].items():
+            if dimension is None:
+                worksheet.column_dimensions.pop(column, None)
+            else:
+                worksheet.column_dimensions[column] = dimension
+        worksheet.column_dimensions.max_outline = snapshot['max_outline']
+        worksheet.sheet_format.outlineLevelCol = snapshot['outline_level_col']
+        
+        cells = snapshot['cells']
+        indexes = snapshot['indexes']
+        # Verwijder cellen die tijdens de test zijn aangemaakt en zet waarden terug
+        for key in [key for key in worksheet._cells if key[1] in indexes and key not in cells]:
+            del worksheet._cells[key]
+        for key, value in cells.items():
+            cell = worksheet._cells[key]
+            # Alleen gewijzigde waarden terugzetten: MergedCell.value is read-only
+            if cell.value != value:
+                cell.value = value
+    
     def _generate_recommendations(self, test_results: Dict[str, Any]) -> List[str]:
         """Genereer aanbevelingen gebaseerd op test resultaten."""
         recommendations = []
         
-        # Analyseer succespercentages
-        success_rates = {}
-        for method_name, result in test_results['methods_tested'].items():
-            if 'error' not in result:
-                total_cols = len(test_results['columns_tested'])
-                success_rate = result['success_count'] / total_cols if total_cols > 0 else 0
-                success_rates[method_name] = success_rate
+        # Verzamel succespercentages (berekend tijdens de test loop)
+        success_rates = {
+            method_name: result['success_rate']
+            for method_name, result in test_results['methods_tested'].items()
+            if 'error' not in result
+        }
         
-        if success_rates:
-            best_method = max(success_rates.items(), key=lambda x: x[1])
-            recommendations.append(f"Beste methode: {best_method[0]} ({best_method[1]*100:.0f}% succes)")
-            
-            if best_method[1] == 1.0:
-                recommendations.append("✅ Perfecte compatibiliteit gevonden")
-            elif best_method[1] >= 0.8:
-                recommendations.append("⚠️ Goede maar niet perfecte compatibiliteit")
-            else:
-                recommendations.append("❌ Lage compatibiliteit - mogelijk problemen")
+        # Geen enkele methode kon getest worden
+        if not success_rates:
+            return ["❌ Alle methodes gefaald", "Aanbeveling: Test handmatig in doeltoepassing"]
+        
+        best_method = max(success_rates.items(), key=lambda x: x[1])
+        recommendations.append(f"Beste methode: {best_method[0]} ({best_method[1]*100:.0f}% succes)")
+        
+        if best_method[1] == 1.0:
+            recommendations.append("✅ Perfecte compatibiliteit gevonden")
+        elif best_method[1] >= 0.8:
+            recommendations.append("⚠️ Goede maar niet perfecte compatibiliteit")
+        else:
+            recommendations.append("❌ Lage compatibiliteit - mogelijk problemen")
         
         # Specifieke aanbevelingen
         if 'all_methods' in success_rates and success_rates['all_methods'] >= 0.8:
@@ -300,15 +382,19 @@ def integrate_with_excel_engine(excel_processor_path: Path = None):
             columns_to_hide: Lijst van kolom letters
             method: Verstop methode ('all_methods' aanbevolen)
         """
-        from enhanced_column_hiding import ColumnHider, HideMethod
+        from enhanced_column_hiding import ColumnHider, HideMethod, hide_columns_fast
         
-        hider = ColumnHider()
-        method_enum = HideMethod(method)
-        
-        result = hider.hide_columns(worksheet, columns_to_hide, method_enum)
+        # Snelle route voor de standaard methode
+        if method == HideMethod.ALL_METHODS.value:
+            errors = hide_columns_fast(worksheet, columns_to_hide)
+        else:
+            hider = ColumnHider()
+            method_enum = HideMethod(method)
+            
+            errors = hider.hide_columns(worksheet, columns_to_hide, method_enum)['errors']
         
-        if result['errors']:
-            print(f"Waarschuwingen bij kolom verbergen: {result['errors']}")
+        if errors:
+            print(f"Waarschuwingen bij kolom verbergen: {errors}")
     
     # Gebruik in _apply_column_decisions methode:
     
@@ -361,30 +447,33 @@ def main():
     )
     
     # Toon resultaten
-    print("\n📊 TEST RESULTATEN:")
-    print("-" * 30)
+    lines = ["\n📊 TEST RESULTATEN:", "-" * 30]
+    total_cols = len(results['columns_tested'])
     
     for method_name, result in results['methods_tested'].items():
         if 'error' in result:
-            print(f"❌ {method_name}: {result['error']}")
+            lines.append(f"❌ {method_name}: {result['error']}")
         else:
-            success_rate = result['success_count'] / len(results['columns_tested']) * 100
-            print(f"✅ {method_name}: {success_rate:.0f}% succes ({result['success_count']}/{len(results['columns_tested'])})")
+            success_rate = result['success_rate'] * 100
+            lines.append(f"✅ {method_name}: {success_rate:.0f}% succes ({result['success_count']}/{total_cols})")
             if 'output_file' in result:
-                print(f"   📄 Output: {result['output_file']}")
+                lines.append(f"   📄 Output: {result['output_file']}")
     
     # Toon aanbevelingen
-    print("\n💡 AANBEVELINGEN:")
-    print("-" * 20)
-    for rec in results['recommendations']:
-        print(f"  {rec}")
+    lines.extend(["\n💡 AANBEVELINGEN:", "-" * 20])
+    lines.extend(f"  {rec}" for rec in results['recommendations'])
+    print("\n".join(lines))
     
     # Sla gedetailleerde resultaten op
     results_file = Path("out/column_hiding_test_results.json")
     results_file.parent.mkdir(exist_ok=True)
     
-    with open(results_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, indent=2, ensure_ascii=False)
+    try:
+        import orjson
+        results_file.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+    except ImportError:
+        with open(results_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
     
     print(f"\n💾 Gedetailleerde resultaten: {results_file}")
     
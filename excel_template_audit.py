@@ -7,21 +7,58 @@ Excel dwingen om verborgen kolommen weer zichtbaar te maken.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Set, Optional
+from typing import List, Dict, Any, Set, Optional, Tuple
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
+import posixpath
 import re
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import product
+from string import ascii_uppercase
 from zipfile import ZipFile
-import xml.etree.ElementTree as ET
+
+# lxml filtert tags in C tijdens iterparse; anders de standaard bibliotheek
+try:
+    from lxml import etree as ET
+    HAS_LXML = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    HAS_LXML = False
 
 from openpyxl import load_workbook
 from openpyxl.worksheet.worksheet import Worksheet
 from openpyxl.workbook.workbook import Workbook
 
 
-@dataclass 
+# Cel referentie zoals A1, $AB$12, AA (hele kolom) of 5 (hele rij)
+_CELL_RE = re.compile(r'\$?([A-Z]*)\$?(\d*)', re.ASCII)
+
+# Opzoektabellen voor alle Excel kolommen A..ZZZ; index 0 is de lege kolom
+_IDX_TO_LETTER = [''] + [
+    ''.join(letters)
+    for length in (1, 2, 3)
+    for letters in product(ascii_uppercase, repeat=length)
+]
+_LETTER_TO_IDX = {letter: index for index, letter in enumerate(_IDX_TO_LETTER)}
+
+# SpreadsheetML tags; <cols> en <sheetData> zijn directe kinderen van <worksheet>
+_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+_COLS_TAG = _NS + 'cols'
+_COL_TAG = _NS + 'col'
+_SHEET_DATA_TAG = _NS + 'sheetData'
+_REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+_PKG_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+_WORKSHEET_REL_TYPE = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet'
+
+
+@dataclass
 class ColumnConflict:
     """Gedetecteerd conflict met kolom verbergen."""
+    # Expliciete __slots__ (dataclass(slots=True) vereist Python 3.10)
+    __slots__ = ('conflict_type', 'sheet_name', 'details', 'severity',
+                 'recommendation', 'technical_info')
+    
     conflict_type: str
     sheet_name: str
     details: str
@@ -29,12 +66,32 @@ class ColumnConflict:
     recommendation: str
     technical_info: Dict[str, Any]
 
+    def to_dict(self) -> dict:
+        """Convert naar dictionary voor het rapport (zonder deepcopy zoals asdict)."""
+        return {
+            "conflict_type": self.conflict_type,
+            "sheet_name": self.sheet_name,
+            "details": self.details,
+            "severity": self.severity,
+            "recommendation": self.recommendation,
+            "technical_info": self.technical_info
+        }
+
 
 class ExcelTemplateAuditor:
     """
     Audit Excel templates voor kolom-verberg conflicten.
     """
     
+    # Per-sheet audit secties: sectie -> (kop, lengte van de scheidingslijn)
+    SHEET_SECTIONS = {
+        'tables': ("📊 AUDIT: Gestructureerde Tabellen (ListObjects)", 45),
+        'data_validation': ("✅ AUDIT: Data Validatie", 25),
+        'merged_cells': ("🔗 AUDIT: Samengevoegde Cellen", 28),
+        'conditional_formatting': ("🎨 AUDIT: Voorwaardelijke Opmaak", 30),
+        'print_area': ("🖨️ AUDIT: Print Gebieden", 23),
+    }
+    
     def __init__(self, target_columns: List[str] = ['AA', 'AB']):
         """
         Initialiseer auditor.
@@ -44,9 +101,29 @@ class ExcelTemplateAuditor:
         """
         self.target_columns = target_columns
         self.target_indices = [self._col_letter_to_index(col) for col in target_columns]
+        self._target_idx_set = frozenset(self.target_indices)
+        self._target_indices_sorted = sorted(self._target_idx_set)
+        # Interval van doelkolommen (standaard AA:AB = 27..28); aaneengesloten
+        # doelkolommen overlappen een range precies als de intervallen overlappen
+        if self._target_indices_sorted:
+            self._min_target_idx = self._target_indices_sorted[0]
+            self._max_target_idx = self._target_indices_sorted[-1]
+        else:
+            self._min_target_idx, self._max_target_idx = 1, 0
+        self._targets_contiguous = (
+            self._max_target_idx - self._min_target_idx + 1 == len(self._target_indices_sorted)
+        )
+        # Doelkolom als losse referentie: wel AA1 of $AA$1, niet AAA1
+        self._target_re = re.compile(
+            r'(?<![A-Za-z])(' + '|'.join(map(re.escape, target_columns)) + r')(?![A-Za-z])'
+        )
         self.conflicts = []
+        self._seen_conflicts = set()  # Sleutels van al gemelde conflicten
+        self.duplicates_suppressed = 0
         self.workbook = None
         self.file_path = None
+        self._zip = None  # Open ZIP archief tijdens audit_file
+        self._output_lines = []  # Console uitvoer, in één keer geschreven
         
     def audit_file(self, file_path: Path) -> Dict[str, Any]:
         """
@@ -60,21 +137,35 @@ class ExcelTemplateAuditor:
         """
         self.file_path = file_path
         self.conflicts = []
+        self._seen_conflicts = set()
+        self.duplicates_suppressed = 0
+        self._output_lines = []
         
-        print(f"🔍 EXCEL TEMPLATE AUDIT: {file_path.name}")
-        print("=" * 60)
+        self._emit(f"🔍 EXCEL TEMPLATE AUDIT: {file_path.name}")
+        self._emit("=" * 60)
         
         try:
-            self.workbook = load_workbook(file_path, data_only=False)
+            # Geen read_only: ReadOnlyWorksheet kent geen tabellen, merged cells,
+            # voorwaardelijke opmaak, validaties of print gebieden. Externe links
+            # worden niet geaudit en hoeven dus niet geladen te worden.
+            self.workbook = load_workbook(file_path, data_only=False, keep_links=False)
             
-            # Voer alle audit checks uit
-            self._audit_structured_tables()
-            self._audit_data_validation()
-            self._audit_named_ranges()
-            self._audit_xml_column_definitions()
-            self._audit_merged_cells()
-            self._audit_conditional_formatting()
-            self._audit_print_areas()
+            # Voer alle audit checks uit; XML checks delen één geopend ZIP archief
+            with ZipFile(file_path, 'r') as zip_file:
+                self._zip = zip_file
+                try:
+                    # Alle per-sheet checks in één doorloop; uitvoer blijft per sectie
+                    sheet_results = [self._audit_sheet(ws) for ws in self.workbook.worksheets]
+                    
+                    self._emit_sheet_section('tables', sheet_results)
+                    self._emit_sheet_section('data_validation', sheet_results)
+                    self._audit_named_ranges()
+                    self._audit_xml_column_definitions()
+                    self._emit_sheet_section('merged_cells', sheet_results)
+                    self._emit_sheet_section('conditional_formatting', sheet_results)
+                    self._emit_sheet_section('print_area', sheet_results)
+                finally:
+                    self._zip = None
             
             # Genereer rapport
             report = self._generate_report()
@@ -82,123 +173,177 @@ class ExcelTemplateAuditor:
             return report
             
         except Exception as e:
-            print(f"❌ Fout bij audit: {e}")
+            self._emit(f"❌ Fout bij audit: {e}")
             return {
                 'file': str(file_path),
                 'error': str(e),
                 'conflicts': [],
                 'summary': {'total_conflicts': 0, 'high_severity': 0}
             }
+        finally:
+            self._flush_output()
+    
+    def _emit(self, line: str) -> None:
+        """Buffer een regel console uitvoer."""
+        self._output_lines.append(line)
     
-    def _audit_structured_tables(self) -> None:
-        """Check voor gestructureerde tabellen die over doelkolommen lopen."""
-        print("\n📊 AUDIT: Gestructureerde Tabellen (ListObjects)")
-        print("-" * 45)
+    def _flush_output(self) -> None:
+        """Schrijf de gebufferde uitvoer in één print naar de console."""
+        if self._output_lines:
+            print("\n".join(self._output_lines))
+            self._output_lines = []
+    
+    def _add_conflict(self, conflict: ColumnConflict) -> None:
+        """Voeg conflict toe, tenzij exact hetzelfde conflict al gemeld is."""
+        key = (
+            conflict.conflict_type,
+            conflict.sheet_name,
+            conflict.details,
+            tuple(sorted((name, str(value)) for name, value in conflict.technical_info.items()))
+        )
+        if key in self._seen_conflicts:
+            self.duplicates_suppressed += 1
+            return
+        self._seen_conflicts.add(key)
+        self.conflicts.append(conflict)
+    
+    def _audit_sheet(self, ws: Worksheet) -> Dict[str, Tuple[List[ColumnConflict], List[str]]]:
+        """
+        Voer alle per-sheet checks uit op één worksheet.
         
-        for sheet_name in self.workbook.sheetnames:
-            ws = self.workbook[sheet_name]
-            
-            if not hasattr(ws, '_tables') or not ws._tables:
-                print(f"  {sheet_name}: Geen tabellen gevonden")
-                continue
-            
-            for table_name, table in ws._tables.items():
-                # Bepaal tabel bereik - table kan string of object zijn
-                if hasattr(table, 'ref'):
-                    table_ref = table.ref
-                else:
-                    table_ref = str(table)
-                    
-                start_col, start_row, end_col, end_row = self._parse_range(table_ref)
-                
-                # Check overlap met doelkolommen
-                overlapping_cols = []
-                for target_idx in self.target_indices:
-                    if start_col <= target_idx <= end_col:
-                        overlapping_cols.append(self._col_index_to_letter(target_idx))
-                
-                if overlapping_cols:
-                    conflict = ColumnConflict(
-                        conflict_type="STRUCTURED_TABLE",
-                        sheet_name=sheet_name,
-                        details=f"Tabel '{table_name}' loopt over kolommen {overlapping_cols}",
-                        severity="HIGH",
-                        recommendation="Verplaats tabel of sluit kolommen uit van tabel bereik",
-                        technical_info={
-                            'table_name': table_name,
-                            'table_range': table_ref,
-                            'overlapping_columns': overlapping_cols
-                        }
-                    )
-                    self.conflicts.append(conflict)
-                    print(f"  ❌ {sheet_name}: Tabel '{table_name}' raakt {overlapping_cols} (bereik: {table_ref})")
-                else:
-                    print(f"  ✅ {sheet_name}: Tabel '{table_name}' OK (bereik: {table_ref})")
-    
-    def _audit_data_validation(self) -> None:
-        """Check voor data validatie regels die doelkolommen gebruiken."""
-        print("\n✅ AUDIT: Data Validatie")
-        print("-" * 25)
-        
-        for sheet_name in self.workbook.sheetnames:
-            ws = self.workbook[sheet_name]
+        Returns:
+            Per sectie de gevonden conflicten en uitvoerregels van deze sheet
+        """
+        return {
+            'tables': self._check_structured_tables(ws),
+            'data_validation': self._check_data_validation(ws),
+            'merged_cells': self._check_merged_cells(ws),
+            'conditional_formatting': self._check_conditional_formatting(ws),
+            'print_area': self._check_print_area(ws),
+        }
+    
+    def _emit_sheet_section(self, section: str,
+                            sheet_results: List[Dict[str, Tuple[List[ColumnConflict], List[str]]]]) -> None:
+        """Voeg de resultaten van één per-sheet sectie toe aan conflicten en uitvoer."""
+        title, rule_width = self.SHEET_SECTIONS[section]
+        self._emit(f"\n{title}")
+        self._emit("-" * rule_width)
+        
+        for result in sheet_results:
+            sheet_conflicts, lines = result[section]
+            for conflict in sheet_conflicts:
+                self._add_conflict(conflict)
+            self._output_lines.extend(lines)
+    
+    def _check_structured_tables(self, ws: Worksheet) -> Tuple[List[ColumnConflict], List[str]]:
+        """Check of gestructureerde tabellen op een sheet over doelkolommen lopen."""
+        sheet_name = ws.title
+        sheet_conflicts = []
+        lines = []
+        
+        tables = getattr(ws, '_tables', None)
+        if not tables:
+            lines.append(f"  {sheet_name}: Geen tabellen gevonden")
+            return sheet_conflicts, lines
+        
+        for table_name, table in tables.items():
+            # Bepaal tabel bereik - table kan string of object zijn
+            table_ref = getattr(table, 'ref', None) or str(table)
             
-            validation_conflicts = []
+            start_col, start_row, end_col, end_row = self._parse_range(table_ref)
             
-            # Check elke cel voor validatie regels
-            if hasattr(ws, 'data_validations') and ws.data_validations:
-                for dv in ws.data_validations.dataValidation:
-                    if hasattr(dv, 'formula1') and dv.formula1:
-                        # Check of formula verwijst naar doelkolommen
-                        formula = str(dv.formula1)
-                        
-                        for target_col in self.target_columns:
-                            if target_col in formula:
-                                affected_ranges = [str(sqref) for sqref in dv.sqref.ranges]
-                                
-                                conflict = ColumnConflict(
-                                    conflict_type="DATA_VALIDATION",
-                                    sheet_name=sheet_name,
-                                    details=f"Validatie gebruikt kolom {target_col} in formule: {formula}",
-                                    severity="MEDIUM",
-                                    recommendation=f"Verplaats bron data van {target_col} naar verborgen sheet",
-                                    technical_info={
-                                        'formula': formula,
-                                        'affected_ranges': affected_ranges,
-                                        'target_column': target_col
-                                    }
-                                )
-                                self.conflicts.append(conflict)
-                                validation_conflicts.append(f"Kolom {target_col} in formule: {formula}")
+            # Check overlap met doelkolommen
+            overlapping_cols = []
+            if self._overlaps_targets(start_col, end_col):
+                overlapping_cols = self._targets_in_bounds(start_col, end_col)
             
-            if validation_conflicts:
-                print(f"  ❌ {sheet_name}: {len(validation_conflicts)} validatie conflicten")
-                for conflict in validation_conflicts:
-                    print(f"     - {conflict}")
+            if overlapping_cols:
+                conflict = ColumnConflict(
+                    conflict_type="STRUCTURED_TABLE",
+                    sheet_name=sheet_name,
+                    details=f"Tabel '{table_name}' loopt over kolommen {overlapping_cols}",
+                    severity="HIGH",
+                    recommendation="Verplaats tabel of sluit kolommen uit van tabel bereik",
+                    technical_info={
+                        'table_name': table_name,
+                        'table_range': table_ref,
+                        'overlapping_columns': overlapping_cols
+                    }
+                )
+                sheet_conflicts.append(conflict)
+                lines.append(f"  ❌ {sheet_name}: Tabel '{table_name}' raakt {overlapping_cols} (bereik: {table_ref})")
             else:
-                print(f"  ✅ {sheet_name}: Geen validatie conflicten")
+                lines.append(f"  ✅ {sheet_name}: Tabel '{table_name}' OK (bereik: {table_ref})")
+        
+        return sheet_conflicts, lines
+    
+    def _check_data_validation(self, ws: Worksheet) -> Tuple[List[ColumnConflict], List[str]]:
+        """Check of data validatie regels op een sheet doelkolommen gebruiken."""
+        sheet_name = ws.title
+        sheet_conflicts = []
+        lines = []
+        
+        validation_conflicts = []
+        
+        # Check elke cel voor validatie regels
+        data_validations = ws.data_validations
+        if data_validations:
+            for dv in data_validations.dataValidation:
+                formula1 = dv.formula1
+                if formula1:
+                    # Check of formula verwijst naar doelkolommen
+                    formula = str(formula1)
+                    found = {m.group(1) for m in self._target_re.finditer(formula)}
+                    
+                    for target_col in self.target_columns:
+                        if target_col in found:
+                            affected_ranges = [str(sqref) for sqref in dv.sqref.ranges]
+                            
+                            conflict = ColumnConflict(
+                                conflict_type="DATA_VALIDATION",
+                                sheet_name=sheet_name,
+                                details=f"Validatie gebruikt kolom {target_col} in formule: {formula}",
+                                severity="MEDIUM",
+                                recommendation=f"Verplaats bron data van {target_col} naar verborgen sheet",
+                                technical_info={
+                                    'formula': formula,
+                                    'affected_ranges': affected_ranges,
+                                    'target_column': target_col
+                                }
+                            )
+                            sheet_conflicts.append(conflict)
+                            validation_conflicts.append(f"Kolom {target_col} in formule: {formula}")
+        
+        if validation_conflicts:
+            lines.append(f"  ❌ {sheet_name}: {len(validation_conflicts)} validatie conflicten")
+            for conflict in validation_conflicts:
+                lines.append(f"     - {conflict}")
+        else:
+            lines.append(f"  ✅ {sheet_name}: Geen validatie conflicten")
+        
+        return sheet_conflicts, lines
     
     def _audit_named_ranges(self) -> None:
         """Check voor named ranges die naar doelkolommen verwijzen."""
-        print("\n📝 AUDIT: Named Ranges")
-        print("-" * 22)
+        self._emit("\n📝 AUDIT: Named Ranges")
+        self._emit("-" * 22)
         
-        if not hasattr(self.workbook, 'defined_names') or not self.workbook.defined_names:
-            print("  ✅ Geen named ranges gevonden")
+        defined_names = self.workbook.defined_names
+        if not defined_names:
+            self._emit("  ✅ Geen named ranges gevonden")
             return
         
         named_range_conflicts = []
         
-        for defined_name in self.workbook.defined_names.definedName:
+        # openpyxl >= 3.1: defined_names is een dict van naam naar DefinedName
+        for defined_name in defined_names.values():
             name = defined_name.name
             destinations = defined_name.destinations
             
             for sheet_name, coord_range in destinations:
                 # Check of range doelkolommen bevat
-                if self._range_contains_target_columns(coord_range):
-                    affected_cols = self._get_columns_in_range(coord_range)
-                    overlapping = [col for col in affected_cols if col in self.target_columns]
-                    
+                overlaps, overlapping = self._range_target_overlap(coord_range)
+                if overlaps:
                     conflict = ColumnConflict(
                         conflict_type="NAMED_RANGE",
                         sheet_name=sheet_name or "Workbook",
@@ -211,76 +356,110 @@ class ExcelTemplateAuditor:
                             'overlapping_columns': overlapping
                         }
                     )
-                    self.conflicts.append(conflict)
+                    self._add_conflict(conflict)
                     named_range_conflicts.append(f"'{name}' → {coord_range} raakt {overlapping}")
         
         if named_range_conflicts:
-            print(f"  ❌ {len(named_range_conflicts)} named range conflicten:")
+            self._emit(f"  ❌ {len(named_range_conflicts)} named range conflicten:")
             for conflict in named_range_conflicts:
-                print(f"     - {conflict}")
+                self._emit(f"     - {conflict}")
         else:
-            print("  ✅ Geen named range conflicten")
+            self._emit("  ✅ Geen named range conflicten")
     
     def _audit_xml_column_definitions(self) -> None:
         """Analyseer XML kolom definities in sheet XML."""
-        print("\n🔧 AUDIT: XML Kolom Definities")
-        print("-" * 32)
+        self._emit("\n🔧 AUDIT: XML Kolom Definities")
+        self._emit("-" * 32)
         
         try:
-            # Open Excel als ZIP voor directe XML toegang
-            with ZipFile(self.file_path, 'r') as zip_file:
-                
-                # Find alle sheet XML bestanden
-                sheet_xmls = [name for name in zip_file.namelist() 
-                            if name.startswith('xl/worksheets/') and name.endswith('.xml')]
-                
-                for sheet_xml in sheet_xmls:
-                    sheet_name = sheet_xml.split('/')[-1].replace('.xml', '')
+            # Alleen worksheets (geen chartsheets of _rels), met hun echte sheet naam
+            sheet_xml_names = self._map_sheet_xml_names()
+            
+            for sheet_xml, sheet_name in sheet_xml_names.items():
+                try:
+                    cols_element = self._read_cols_element(sheet_xml)
                     
-                    try:
-                        xml_content = zip_file.read(sheet_xml).decode('utf-8')
-                        root = ET.fromstring(xml_content)
+                    if cols_element is not None:
+                        col_conflicts = self._analyze_cols_xml(cols_element, sheet_name)
                         
-                        # Find <cols> sectie
-                        cols_element = root.find('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}cols')
-                        
-                        if cols_element is not None:
-                            col_conflicts = self._analyze_cols_xml(cols_element, sheet_name)
-                            
-                            if col_conflicts:
-                                print(f"  ❌ {sheet_name}: {len(col_conflicts)} XML kolom conflicten")
-                                for conflict in col_conflicts:
-                                    print(f"     - {conflict}")
-                            else:
-                                print(f"  ✅ {sheet_name}: XML kolom definities OK")
+                        if col_conflicts:
+                            self._emit(f"  ❌ {sheet_name}: {len(col_conflicts)} XML kolom conflicten")
+                            for conflict in col_conflicts:
+                                self._emit(f"     - {conflict}")
                         else:
-                            print(f"  ✅ {sheet_name}: Geen <cols> definities")
-                            
-                    except Exception as e:
-                        print(f"  ⚠️ {sheet_name}: Fout bij XML analyse: {e}")
+                            self._emit(f"  ✅ {sheet_name}: XML kolom definities OK")
+                    else:
+                        self._emit(f"  ✅ {sheet_name}: Geen <cols> definities")
                         
+                except Exception as e:
+                    self._emit(f"  ⚠️ {sheet_name}: Fout bij XML analyse: {e}")
+                    
         except Exception as e:
-            print(f"  ❌ Fout bij XML audit: {e}")
+            self._emit(f"  ❌ Fout bij XML audit: {e}")
+    
+    def _map_sheet_xml_names(self) -> Dict[str, str]:
+        """Koppel worksheet XML paden in het archief aan de sheet namen uit workbook.xml."""
+        rels_root = ET.fromstring(self._zip.read('xl/_rels/workbook.xml.rels'))
+        
+        worksheet_paths = {}
+        for rel in rels_root.iter(_PKG_REL_NS + 'Relationship'):
+            if rel.get('Type') != _WORKSHEET_REL_TYPE:
+                continue
+            target = rel.get('Target', '')
+            if target.startswith('/'):
+                worksheet_paths[rel.get('Id')] = target[1:]
+            else:
+                worksheet_paths[rel.get('Id')] = posixpath.normpath(posixpath.join('xl', target))
+        
+        workbook_root = ET.fromstring(self._zip.read('xl/workbook.xml'))
+        
+        sheet_xml_names = {}
+        for sheet in workbook_root.iter(_NS + 'sheet'):
+            sheet_xml = worksheet_paths.get(sheet.get(_REL_NS + 'id'))
+            if sheet_xml:
+                sheet_xml_names[sheet_xml] = sheet.get('name')
+        
+        return sheet_xml_names
+    
+    def _read_cols_element(self, sheet_xml: str) -> Optional['ET.Element']:
+        """
+        Lees alleen de <cols> sectie van een sheet XML.
+        
+        <cols> staat altijd vóór <sheetData>, dus het streamen stopt zodra
+        </cols> of <sheetData> bereikt is; de celdata wordt nooit geparsed.
+        """
+        with self._zip.open(sheet_xml) as fh:
+            if HAS_LXML:
+                events = ET.iterparse(fh, events=('start', 'end'), tag=(_COLS_TAG, _SHEET_DATA_TAG))
+            else:
+                events = ET.iterparse(fh, events=('start', 'end'))
+            
+            for event, elem in events:
+                if event == 'end' and elem.tag == _COLS_TAG:
+                    return elem
+                if event == 'start' and elem.tag == _SHEET_DATA_TAG:
+                    return None
+        
+        return None
     
-    def _analyze_cols_xml(self, cols_element: ET.Element, sheet_name: str) -> List[str]:
+    def _analyze_cols_xml(self, cols_element: 'ET.Element', sheet_name: str) -> List[str]:
         """Analyseer <cols> XML element voor kolom conflicten."""
         conflicts = []
         
-        for col_elem in cols_element.findall('.//{http://schemas.openxmlformats.org/spreadsheetml/2006/main}col'):
-            min_col = int(col_elem.get('min', 0))
-            max_col = int(col_elem.get('max', 0))
-            hidden = col_elem.get('hidden', 'false').lower() == 'true'
-            width = col_elem.get('width', 'auto')
+        for col_elem in cols_element.findall(_COL_TAG):
+            attrib = col_elem.attrib
+            min_col = int(attrib.get('min', '0'))
+            max_col = int(attrib.get('max', '0'))
+            # xsd:boolean: Excel en openpyxl schrijven hidden="1"
+            hidden = attrib.get('hidden', 'false').lower() in ('1', 'true')
+            width = attrib.get('width', 'auto')
             
             # Check overlap met doelkolommen
-            overlapping_indices = []
-            for target_idx in self.target_indices:
-                if min_col <= target_idx <= max_col:
-                    overlapping_indices.append(target_idx)
+            if not self._overlaps_targets(min_col, max_col):
+                continue
+            overlapping_letters = self._targets_in_bounds(min_col, max_col)
             
-            if overlapping_indices:
-                overlapping_letters = [self._col_index_to_letter(idx) for idx in overlapping_indices]
-                
+            if overlapping_letters:
                 conflict_detail = f"XML col definitie min={min_col} max={max_col} (kolommen {overlapping_letters})"
                 if not hidden:
                     conflict_detail += " - NIET verborgen in XML"
@@ -301,121 +480,120 @@ class ExcelTemplateAuditor:
                         'overlapping_columns': overlapping_letters
                     }
                 )
-                self.conflicts.append(conflict)
+                self._add_conflict(conflict)
                 conflicts.append(conflict_detail)
         
         return conflicts
     
-    def _audit_merged_cells(self) -> None:
-        """Check voor samengevoegde cellen die doelkolommen bevatten."""
-        print("\n🔗 AUDIT: Samengevoegde Cellen")
-        print("-" * 28)
-        
-        for sheet_name in self.workbook.sheetnames:
-            ws = self.workbook[sheet_name]
-            merged_conflicts = []
-            
-            for merged_range in ws.merged_cells.ranges:
+    def _check_merged_cells(self, ws: Worksheet) -> Tuple[List[ColumnConflict], List[str]]:
+        """Check of samengevoegde cellen op een sheet doelkolommen bevatten."""
+        sheet_name = ws.title
+        sheet_conflicts = []
+        lines = []
+        
+        merged_conflicts = []
+        
+        # MergedCellRange heeft al integer grenzen; alleen conflicten worden naar tekst omgezet
+        merged_ranges = ws.merged_cells.ranges
+        for merged_range in merged_ranges:
+            if self._overlaps_targets(merged_range.min_col, merged_range.max_col):
                 range_str = str(merged_range)
-                if self._range_contains_target_columns(range_str):
-                    overlapping = self._get_columns_in_range(range_str)
-                    target_overlap = [col for col in overlapping if col in self.target_columns]
-                    
-                    conflict = ColumnConflict(
-                        conflict_type="MERGED_CELLS",
-                        sheet_name=sheet_name,
-                        details=f"Samengevoegde cellen {range_str} bevatten kolommen {target_overlap}",
-                        severity="MEDIUM",
-                        recommendation="Split samengevoegde cellen of verplaats naar andere kolommen",
-                        technical_info={
-                            'merged_range': range_str,
-                            'overlapping_columns': target_overlap
-                        }
-                    )
-                    self.conflicts.append(conflict)
-                    merged_conflicts.append(f"{range_str} → {target_overlap}")
-            
-            if merged_conflicts:
-                print(f"  ❌ {sheet_name}: {len(merged_conflicts)} samengevoegde cel conflicten")
-                for conflict in merged_conflicts:
-                    print(f"     - {conflict}")
-            else:
-                print(f"  ✅ {sheet_name}: Geen samengevoegde cel conflicten")
-    
-    def _audit_conditional_formatting(self) -> None:
-        """Check voor voorwaardelijke opmaak die doelkolommen gebruikt."""
-        print("\n🎨 AUDIT: Voorwaardelijke Opmaak")
-        print("-" * 30)
+                target_overlap = self._targets_in_bounds(merged_range.min_col, merged_range.max_col)
+                conflict = ColumnConflict(
+                    conflict_type="MERGED_CELLS",
+                    sheet_name=sheet_name,
+                    details=f"Samengevoegde cellen {range_str} bevatten kolommen {target_overlap}",
+                    severity="MEDIUM",
+                    recommendation="Split samengevoegde cellen of verplaats naar andere kolommen",
+                    technical_info={
+                        'merged_range': range_str,
+                        'overlapping_columns': target_overlap
+                    }
+                )
+                sheet_conflicts.append(conflict)
+                merged_conflicts.append(f"{range_str} → {target_overlap}")
         
-        for sheet_name in self.workbook.sheetnames:
-            ws = self.workbook[sheet_name]
-            formatting_conflicts = []
-            
-            if hasattr(ws, 'conditional_formatting') and ws.conditional_formatting:
-                for cf in ws.conditional_formatting:
-                    # Check bereiken waar opmaak op wordt toegepast
-                    for range_obj in cf.sqref.ranges:
-                        range_str = str(range_obj)
-                        if self._range_contains_target_columns(range_str):
-                            overlapping = self._get_columns_in_range(range_str)
-                            target_overlap = [col for col in overlapping if col in self.target_columns]
-                            
-                            conflict = ColumnConflict(
-                                conflict_type="CONDITIONAL_FORMATTING",
-                                sheet_name=sheet_name,
-                                details=f"Voorwaardelijke opmaak op bereik {range_str} bevat kolommen {target_overlap}",
-                                severity="LOW",
-                                recommendation="Verwijder voorwaardelijke opmaak van verborgen kolommen",
-                                technical_info={
-                                    'formatting_range': range_str,
-                                    'overlapping_columns': target_overlap
-                                }
-                            )
-                            self.conflicts.append(conflict)
-                            formatting_conflicts.append(f"{range_str} → {target_overlap}")
-            
-            if formatting_conflicts:
-                print(f"  ❌ {sheet_name}: {len(formatting_conflicts)} opmaak conflicten")
-                for conflict in formatting_conflicts:
-                    print(f"     - {conflict}")
-            else:
-                print(f"  ✅ {sheet_name}: Geen opmaak conflicten")
+        if merged_conflicts:
+            lines.append(f"  ❌ {sheet_name}: {len(merged_conflicts)} samengevoegde cel conflicten")
+            for conflict in merged_conflicts:
+                lines.append(f"     - {conflict}")
+        else:
+            lines.append(f"  ✅ {sheet_name}: Geen samengevoegde cel conflicten")
+        
+        return sheet_conflicts, lines
     
-    def _audit_print_areas(self) -> None:
-        """Check voor print gebieden die doelkolommen bevatten."""
-        print("\n🖨️ AUDIT: Print Gebieden")
-        print("-" * 23)
+    def _check_conditional_formatting(self, ws: Worksheet) -> Tuple[List[ColumnConflict], List[str]]:
+        """Check of voorwaardelijke opmaak op een sheet doelkolommen gebruikt."""
+        sheet_name = ws.title
+        sheet_conflicts = []
+        lines = []
+        
+        formatting_conflicts = []
+        
+        conditional_formatting = ws.conditional_formatting
+        if conditional_formatting:
+            for cf in conditional_formatting:
+                # Check bereiken waar opmaak op wordt toegepast
+                for range_obj in cf.sqref.ranges:
+                    if self._overlaps_targets(range_obj.min_col, range_obj.max_col):
+                        range_str = str(range_obj)
+                        target_overlap = self._targets_in_bounds(range_obj.min_col, range_obj.max_col)
+                        conflict = ColumnConflict(
+                            conflict_type="CONDITIONAL_FORMATTING",
+                            sheet_name=sheet_name,
+                            details=f"Voorwaardelijke opmaak op bereik {range_str} bevat kolommen {target_overlap}",
+                            severity="LOW",
+                            recommendation="Verwijder voorwaardelijke opmaak van verborgen kolommen",
+                            technical_info={
+                                'formatting_range': range_str,
+                                'overlapping_columns': target_overlap
+                            }
+                        )
+                        sheet_conflicts.append(conflict)
+                        formatting_conflicts.append(f"{range_str} → {target_overlap}")
+        
+        if formatting_conflicts:
+            lines.append(f"  ❌ {sheet_name}: {len(formatting_conflicts)} opmaak conflicten")
+            for conflict in formatting_conflicts:
+                lines.append(f"     - {conflict}")
+        else:
+            lines.append(f"  ✅ {sheet_name}: Geen opmaak conflicten")
         
-        for sheet_name in self.workbook.sheetnames:
-            ws = self.workbook[sheet_name]
-            
-            if ws.print_area:
-                if self._range_contains_target_columns(ws.print_area):
-                    overlapping = self._get_columns_in_range(ws.print_area)
-                    target_overlap = [col for col in overlapping if col in self.target_columns]
-                    
-                    conflict = ColumnConflict(
-                        conflict_type="PRINT_AREA",
-                        sheet_name=sheet_name,
-                        details=f"Print gebied {ws.print_area} bevat kolommen {target_overlap}",
-                        severity="LOW",
-                        recommendation="Pas print gebied aan om verborgen kolommen uit te sluiten",
-                        technical_info={
-                            'print_area': ws.print_area,
-                            'overlapping_columns': target_overlap
-                        }
-                    )
-                    self.conflicts.append(conflict)
-                    print(f"  ❌ {sheet_name}: Print gebied raakt {target_overlap} ({ws.print_area})")
-                else:
-                    print(f"  ✅ {sheet_name}: Print gebied OK")
+        return sheet_conflicts, lines
+    
+    def _check_print_area(self, ws: Worksheet) -> Tuple[List[ColumnConflict], List[str]]:
+        """Check of het print gebied van een sheet doelkolommen bevat."""
+        sheet_name = ws.title
+        sheet_conflicts = []
+        lines = []
+        
+        if ws.print_area:
+            overlaps, target_overlap = self._range_target_overlap(ws.print_area)
+            if overlaps:
+                conflict = ColumnConflict(
+                    conflict_type="PRINT_AREA",
+                    sheet_name=sheet_name,
+                    details=f"Print gebied {ws.print_area} bevat kolommen {target_overlap}",
+                    severity="LOW",
+                    recommendation="Pas print gebied aan om verborgen kolommen uit te sluiten",
+                    technical_info={
+                        'print_area': ws.print_area,
+                        'overlapping_columns': target_overlap
+                    }
+                )
+                sheet_conflicts.append(conflict)
+                lines.append(f"  ❌ {sheet_name}: Print gebied raakt {target_overlap} ({ws.print_area})")
             else:
-                print(f"  ✅ {sheet_name}: Geen print gebied ingesteld")
+                lines.append(f"  ✅ {sheet_name}: Print gebied OK")
+        else:
+            lines.append(f"  ✅ {sheet_name}: Geen print gebied ingesteld")
+        
+        return sheet_conflicts, lines
     
     def _generate_report(self) -> Dict[str, Any]:
         """Genereer uitgebreid audit rapport."""
-        print(f"\n📋 AUDIT RAPPORT")
-        print("=" * 20)
+        self._emit(f"\n📋 AUDIT RAPPORT")
+        self._emit("=" * 20)
         
         # Groepeer conflicten per type
         conflicts_by_type = {}
@@ -430,15 +608,17 @@ class ExcelTemplateAuditor:
         
         # Print samenvatting
         total_conflicts = len(self.conflicts)
-        print(f"Totaal conflicten: {total_conflicts}")
-        print(f"Hoge prioriteit: {conflicts_by_severity['HIGH']}")
-        print(f"Gemiddelde prioriteit: {conflicts_by_severity['MEDIUM']}")
-        print(f"Lage prioriteit: {conflicts_by_severity['LOW']}")
+        self._emit(f"Totaal conflicten: {total_conflicts}")
+        self._emit(f"Hoge prioriteit: {conflicts_by_severity['HIGH']}")
+        self._emit(f"Gemiddelde prioriteit: {conflicts_by_severity['MEDIUM']}")
+        self._emit(f"Lage prioriteit: {conflicts_by_severity['LOW']}")
+        if self.duplicates_suppressed:
+            self._emit(f"Dubbele conflicten overgeslagen: {self.duplicates_suppressed}")
         
         if total_conflicts == 0:
-            print("✅ Geen conflicten gevonden - kolommen zouden verborgen moeten blijven!")
+            self._emit("✅ Geen conflicten gevonden - kolommen zouden verborgen moeten blijven!")
         else:
-            print(f"\n❌ {total_conflicts} conflicten gevonden die Excel kunnen dwingen kolommen zichtbaar te maken")
+            self._emit(f"\n❌ {total_conflicts} conflicten gevonden die Excel kunnen dwingen kolommen zichtbaar te maken")
         
         # Genereer aanbevelingen
         recommendations = self._generate_recommendations(conflicts_by_type)
@@ -449,7 +629,8 @@ class ExcelTemplateAuditor:
             'total_conflicts': total_conflicts,
             'conflicts_by_severity': conflicts_by_severity,
             'conflicts_by_type': {k: len(v) for k, v in conflicts_by_type.items()},
-            'conflicts': [asdict(conflict) for conflict in self.conflicts],
+            'conflicts': [conflict.to_dict() for conflict in self.conflicts],
+            'duplicates_suppressed': self.duplicates_suppressed,
             'recommendations': recommendations,
             'audit_timestamp': str(Path.cwd())
         }
@@ -479,63 +660,95 @@ class ExcelTemplateAuditor:
     
     # Helper methods
     
-    def _col_letter_to_index(self, col_letter: str) -> int:
+    @staticmethod
+    def _col_letter_to_index(col_letter: str) -> int:
         """Convert kolom letter naar 1-based index."""
-        result = 0
-        for char in col_letter:
-            result = result * 26 + (ord(char) - ord('A') + 1)
-        return result
+        return _LETTER_TO_IDX[col_letter]
     
-    def _col_index_to_letter(self, index: int) -> str:
+    @staticmethod
+    def _col_index_to_letter(index: int) -> str:
         """Convert 1-based index naar kolom letter."""
-        result = ""
-        while index > 0:
-            index -= 1
-            result = chr(index % 26 + ord('A')) + result
-            index //= 26
-        return result
-    
-    def _parse_range(self, range_str: str) -> tuple:
+        return _IDX_TO_LETTER[index]
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _parse_range(range_str: str) -> tuple:
         """Parse Excel range naar (start_col, start_row, end_col, end_row)."""
-        # Simplified parser voor basis ranges
+        # Simplified parser voor basis ranges; sheet prefix ('Blad'!A1:B2) negeren
+        range_str = range_str.rpartition('!')[2]
         if ':' in range_str:
             start, end = range_str.split(':')
         else:
             start = end = range_str
         
-        start_col = self._extract_col_from_cell(start)
-        start_row = self._extract_row_from_cell(start)
-        end_col = self._extract_col_from_cell(end)
-        end_row = self._extract_row_from_cell(end)
+        start_col = ExcelTemplateAuditor._extract_col_from_cell(start)
+        start_row = ExcelTemplateAuditor._extract_row_from_cell(start)
+        end_col = ExcelTemplateAuditor._extract_col_from_cell(end)
+        end_row = ExcelTemplateAuditor._extract_row_from_cell(end)
         
         return start_col, start_row, end_col, end_row
     
-    def _extract_col_from_cell(self, cell_ref: str) -> int:
+    @staticmethod
+    def _extract_col_from_cell(cell_ref: str) -> int:
         """Extraheer kolom index van cel referentie."""
-        col_letters = ''.join([c for c in cell_ref if c.isalpha()])
-        return self._col_letter_to_index(col_letters)
+        return ExcelTemplateAuditor._col_letter_to_index(_CELL_RE.match(cell_ref).group(1))
     
-    def _extract_row_from_cell(self, cell_ref: str) -> int:
+    @staticmethod
+    def _extract_row_from_cell(cell_ref: str) -> int:
         """Extraheer rij nummer van cel referentie."""
-        row_digits = ''.join([c for c in cell_ref if c.isdigit()])
+        row_digits = _CELL_RE.match(cell_ref).group(2)
         return int(row_digits) if row_digits else 1
     
-    def _range_contains_target_columns(self, range_str: str) -> bool:
-        """Check of range overlap heeft met doelkolommen."""
+    @staticmethod
+    @lru_cache(maxsize=2048)
+    def _analyze_range(range_str: str) -> Optional[Tuple[int, int]]:
+        """Geef (start_col, end_col) van een range, of None als die niet te parsen is."""
         try:
-            start_col, _, end_col, _ = self._parse_range(range_str)
-            return any(start_col <= target_idx <= end_col for target_idx in self.target_indices)
-        except:
+            start_col, _, end_col, _ = ExcelTemplateAuditor._parse_range(range_str)
+            return start_col, end_col
+        except Exception:
+            return None
+    
+    def _overlaps_targets(self, start_col: int, end_col: int) -> bool:
+        """Check of kolom interval start_col..end_col een doelkolom bevat."""
+        if start_col > self._max_target_idx or end_col < self._min_target_idx:
+            return False
+        if self._targets_contiguous:
+            return True
+        # Kleinste doelkolom >= start_col moet binnen de range vallen
+        pos = bisect_left(self._target_indices_sorted, start_col)
+        return pos < len(self._target_indices_sorted) and self._target_indices_sorted[pos] <= end_col
+    
+    def _range_target_overlap(self, range_str: str) -> Tuple[bool, List[str]]:
+        """
+        Bepaal met één parse of range doelkolommen raakt en welke.
+        
+        De overlap wordt op kolom indices bepaald; alleen de geraakte
+        doelkolommen worden naar letters omgezet, niet de hele range.
+        """
+        if ',' in range_str:
+            # Meerdere gebieden ('S'!$A$1:$B$3,'S'!$D$1:$E$2): elk gebied apart testen
+            area_results = [self._range_target_overlap(area) for area in range_str.split(',')]
+            letters = {letter for _, area_letters in area_results for letter in area_letters}
+            return (any(overlaps for overlaps, _ in area_results),
+                    sorted(letters, key=self._col_letter_to_index))
+        
+        bounds = self._analyze_range(range_str)
+        if bounds is None:
             # Fallback: check of doelkolom letters in range string staan
-            return any(col in range_str for col in self.target_columns)
+            return self._target_re.search(range_str) is not None, []
+        
+        start_col, end_col = bounds
+        if not self._overlaps_targets(start_col, end_col):
+            return False, []
+        
+        return True, self._targets_in_bounds(start_col, end_col)
     
-    def _get_columns_in_range(self, range_str: str) -> List[str]:
-        """Krijg alle kolom letters in een range."""
-        try:
-            start_col, _, end_col, _ = self._parse_range(range_str)
-            return [self._col_index_to_letter(i) for i in range(start_col, end_col + 1)]
-        except:
-            return []
+    def _targets_in_bounds(self, start_col: int, end_col: int) -> List[str]:
+        """Geef de doelkolom letters binnen start_col..end_col, oplopend."""
+        targets = self._target_indices_sorted
+        overlapping = targets[bisect_left(targets, start_col):bisect_right(targets, end_col)]
+        return [self._col_index_to_letter(idx) for idx in overlapping]
 
 
 def main():
@@ -562,8 +775,12 @@ def main():
         
         # Sla rapport op
         report_file = file_path.parent / f"audit_report_{file_path.stem}.json"
-        with open(report_file, 'w', encoding='utf-8') as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        try:
+            import orjson
+            report_file.write_bytes(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+        except ImportError:
+            with open(report_file, 'w', encoding='utf-8') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"\n💾 Rapport opgeslagen: {report_file}")
     
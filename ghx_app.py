@@ -13,10 +13,6 @@ import tempfile
 import os
 import base64
 
-# Voeg src toe aan path
-import sys
-sys.path.append('src')
-
 from src.context import Context
 from src.mapping import FieldMapping
 from src.engine import TemplateEngine
@@ -4,10 +4,10 @@ Core engine voor GHX Template Generator.
 Bevat de beslislogica voor veld zichtbaarheid, verplichte velden en dependencies.
 """
 
-from typing import Dict, Any, Set, List, Optional
+from typing import Dict, Any, Set, List, Optional, Tuple
 from dataclasses import dataclass
-from context import Context
-from mapping import FieldMapping
+from .context import Context
+from .mapping import FieldMapping
 
 
 @dataclass
@@ -322,3 +322,22 @@ class TemplateEngine:
             Set van kolom letters die verplicht moeten zijn
         """
         return {decision.column for decision in decisions if decision.visible and decision.mandatory}
+    
+    def count_decisions(self, decisions: List[FieldDecision]) -> Tuple[int, int]:
+        """
+        Tel zichtbare en verplichte velden in een enkele doorloop.
+        
+        Args:
+            decisions: Lijst van FieldDecision objecten
+            
+        Returns:
+            Tuple van (aantal zichtbaar, aantal zichtbaar en verplicht)
+        """
+        visible_count = 0
+        mandatory_count = 0
+        for decision in decisions:
+            if decision.visible:
+                visible_count += 1
+                if decision.mandatory:
+                    mandatory_count += 1
+        return visible_count, mandatory_count
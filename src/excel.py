@@ -5,12 +5,12 @@ Bevat functies voor het aanpassen van Excel bestanden met openpyxl.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Union, BinaryIO
 from openpyxl import load_workbook, Workbook
 from openpyxl.styles import PatternFill, Font
 from openpyxl.comments import Comment
 from openpyxl.worksheet.worksheet import Worksheet
-from engine import FieldDecision
+from .engine import FieldDecision
 
 
 class ExcelProcessor:
@@ -48,7 +48,7 @@ class ExcelProcessor:
     
     def process_template(self, 
                         input_path: Path, 
-                        output_path: Path,
+                        output_path: Union[Path, BinaryIO],
                         decisions: List[FieldDecision],
                         context_dict: Dict[str, Any],
                         sheet_name: str = "Sheet1") -> None:
@@ -57,7 +57,7 @@ class ExcelProcessor:
         
         Args:
             input_path: Pad naar input template
-            output_path: Pad voor output bestand
+            output_path: Pad of binaire buffer (bijv. BytesIO) voor output bestand
             decisions: Lijst van veld beslissingen
             context_dict: Context dictionary voor stempel
             sheet_name: Naam van sheet om aan te passen
@@ -207,7 +207,7 @@ class ExcelProcessor:
             context_dict: Context dictionary
         """
         # Genereer compacte code
-        from context import Context
+        from .context import Context
         
         # Reconstruct context object om preset code te genereren
         try:
@@ -309,15 +309,19 @@ class ExcelProcessor:
             method: Verstop methode ('all_methods' aanbevolen voor beste compatibiliteit)
         """
         try:
-            from enhanced_column_hiding import ColumnHider, HideMethod
+            from enhanced_column_hiding import ColumnHider, HideMethod, hide_columns_fast
             
-            hider = ColumnHider()
-            method_enum = HideMethod(method)
-            
-            result = hider.hide_columns(worksheet, columns_to_hide, method_enum)
+            # Snelle route voor de standaard methode: geen resultaat administratie nodig
+            if method == HideMethod.ALL_METHODS.value:
+                errors = hide_columns_fast(worksheet, columns_to_hide)
+            else:
+                hider = ColumnHider()
+                method_enum = HideMethod(method)
+                
+                errors = hider.hide_columns(worksheet, columns_to_hide, method_enum)['errors']
             
-            if result['errors']:
-                print(f"Waarschuwingen bij kolom verbergen: {result['errors']}")
+            if errors:
+                print(f"Waarschuwingen bij kolom verbergen: {errors}")
             else:
                 print(f"✅ Kolommen {columns_to_hide} succesvol verborgen met methode '{method}'")
                 
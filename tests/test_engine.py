@@ -197,6 +197,26 @@ class TestTemplateEngine(unittest.TestCase):
         taal_code_decision = decisions_dict["Artikelomschrijving Taal Code"]
         self.assertTrue(taal_code_decision.dependency_satisfied)  # Dependency voldaan
     
+    def test_count_decisions(self):
+        """Test telling van zichtbare en verplichte velden."""
+        context = Context(
+            template_choice="custom",
+            gs1_mode="gs1",
+            all_orderable=True,
+            product_type="medisch",
+            has_chemicals=False,
+            is_staffel_file=False,
+            institutions=[],
+            version="v1.0.0"
+        )
+        
+        engine = TemplateEngine(context, self.mapping)
+        decisions = engine.process_all_fields()
+        
+        visible_count, mandatory_count = engine.count_decisions(decisions)
+        self.assertEqual(visible_count, len(engine.get_visible_columns(decisions)))
+        self.assertEqual(mandatory_count, len(engine.get_mandatory_columns(decisions)))
+    
     def test_context_labels(self):
         """Test context label generatie."""
         context = Context(
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Tests voor het testen en terugdraaien van verstop-methodes in ColumnHider.
+"""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openpyxl import Workbook
+
+from enhanced_column_hiding import ColumnHider, HideMethod, hide_columns_fast
+from src.excel import ExcelProcessor
+
+
+class TestColumnHiderRestore(unittest.TestCase):
+    """Test cases voor snapshot/restore rond samengevoegde cellen."""
+    
+    def setUp(self):
+        """Maak workbook met een samengevoegd bereik in de doelkolommen."""
+        self.workbook = Workbook()
+        self.worksheet = self.workbook.active
+        self.worksheet.title = "Template NL"
+        for row in range(1, 13):
+            self.worksheet.append([f"r{row}c{col}" for col in range(1, 31)])
+        self.worksheet.merge_cells("AA10:AB11")
+        self.hider = ColumnHider()
+    
+    def test_restore_with_merged_cells(self):
+        """Restore na wissen herstelt waarden zonder MergedCell te schrijven."""
+        ws = self.worksheet
+        snapshot = self.hider._snapshot_columns(ws, ['AA', 'AB'])
+        
+        self.hider.hide_columns(ws, ['AA', 'AB'], HideMethod.CONTENT_CLEAR, clear_content=True)
+        self.assertIsNone(ws['AA2'].value)
+        
+        self.hider._restore_columns(ws, snapshot)
+        
+        self.assertEqual(ws['AA2'].value, "r2c27")
+        self.assertEqual(ws['AB12'].value, "r12c28")
+        self.assertEqual(ws['AA10'].value, "r10c27")
+        self.assertIn("AA10:AB11", [str(rng) for rng in ws.merged_cells.ranges])
+        self.assertFalse(ws.column_dimensions['AA'].hidden)
+    
+    def test_all_methods_with_merged_cells(self):
+        """Alle methodes slagen op een sheet met samengevoegde doelkolommen."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            input_file = Path(tmp_dir) / "merged.xlsx"
+            self.workbook.save(input_file)
+            
+            cwd = os.getcwd()
+            os.chdir(tmp_dir)
+            try:
+                results = self.hider.test_all_methods(input_file)
+            finally:
+                os.chdir(cwd)
+        
+        for method in HideMethod:
+            result = results['methods_tested'][method.value]
+            self.assertNotIn('error', result, method.value)
+            self.assertEqual(result['success_count'], 2)
+
+class TestHideColumnsFast(unittest.TestCase):
+    """Test cases voor de snelle variant zonder resultaat administratie."""
+    
+    @staticmethod
+    def _dimension_state(worksheet):
+        """Vergelijkbare weergave van alle kolom dimensies."""
+        return sorted(
+            (key, dim.min, dim.max, dim.hidden, dim.width, dim.outline_level, dim.collapsed)
+            for key, dim in worksheet.column_dimensions.items()
+        )
+    
+    def test_matches_column_hider_all_methods(self):
+        """hide_columns_fast en ColumnHider met ALL_METHODS geven identieke kolom dimensies."""
+        fast_ws = Workbook().active
+        hider_ws = Workbook().active
+        for ws in (fast_ws, hider_ws):
+            ws.append([f"c{col}" for col in range(1, 31)])
+            ws.column_dimensions['AA'].width = 25
+        
+        hide_columns_fast(fast_ws, ['AA', 'AB'])
+        results = ColumnHider().hide_columns(hider_ws, ['AA', 'AB'], HideMethod.ALL_METHODS)
+        
+        self.assertEqual(results['success_count'], 2)
+        self.assertEqual(self._dimension_state(fast_ws), self._dimension_state(hider_ws))
+        self.assertTrue(fast_ws.column_dimensions['AA'].hidden)
+        self.assertEqual(fast_ws.column_dimensions['AB'].width, 0)
+    
+    def test_invalid_column_reported_like_column_hider(self):
+        """Ongeldige kolom geeft dezelfde fout als ColumnHider en maakt geen dimensie aan."""
+        fast_ws = Workbook().active
+        hider_ws = Workbook().active
+        
+        errors = hide_columns_fast(fast_ws, ['AA', '1A'])
+        results = ColumnHider().hide_columns(hider_ws, ['AA', '1A'], HideMethod.ALL_METHODS)
+        
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors, results['errors'])
+        self.assertTrue(fast_ws.column_dimensions['AA'].hidden)
+        self.assertNotIn('1A', fast_ws.column_dimensions)
+    
+    def test_hide_columns_permanently_output(self):
+        """Snelle route meldt fouten als waarschuwing, anders succes, net als de ColumnHider route."""
+        processor = ExcelProcessor()
+        
+        def run(columns, method):
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                processor.hide_columns_permanently(Workbook().active, columns, method)
+            return output.getvalue()
+        
+        self.assertIn("succesvol verborgen", run(['AA', 'AB'], "all_methods"))
+        
+        fast_output = run(['AA', '1A'], "all_methods")
+        self.assertTrue(fast_output.startswith("Waarschuwingen bij kolom verbergen: "))
+        self.assertIn("Kolom 1A:", fast_output)
+        self.assertNotIn("succesvol", fast_output)
+        self.assertEqual(fast_output, run(['AA', '1A'], "combined"))
+
+
+if __name__ == '__main__':
+    unittest.main()
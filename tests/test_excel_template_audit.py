@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Tests voor ExcelTemplateAuditor.
+"""
+
+import contextlib
+import io
+import re
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from zipfile import ZipFile
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from openpyxl import Workbook
+from openpyxl.chart import BarChart
+from openpyxl.workbook.defined_name import DefinedName
+from openpyxl.worksheet.datavalidation import DataValidation
+
+from excel_template_audit import ColumnConflict, ExcelTemplateAuditor
+
+
+class TestExcelTemplateAuditor(unittest.TestCase):
+    """Test cases voor de audit checks op AA/AB."""
+    
+    def setUp(self):
+        """Maak tijdelijke map en auditor voor de doelkolommen AA/AB."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.auditor = ExcelTemplateAuditor(['AA', 'AB'])
+    
+    def tearDown(self):
+        """Ruim tijdelijke bestanden op."""
+        self.tmp_dir.cleanup()
+    
+    def _audit(self, workbook: Workbook) -> dict:
+        """Sla workbook op en voer de audit stil uit."""
+        file_path = Path(self.tmp_dir.name) / "template.xlsx"
+        workbook.save(file_path)
+        return self._audit_path(file_path)
+    
+    def _audit_path(self, file_path: Path) -> dict:
+        """Voer de audit stil uit; de console uitvoer blijft bewaard in self.output."""
+        buffer = io.StringIO()
+        with contextlib.redirect_stdout(buffer):
+            report = self.auditor.audit_file(file_path)
+        self.output = buffer.getvalue()
+        self.assertNotIn('error', report)
+        return report
+    
+    def _conflicts(self, report: dict, conflict_type: str) -> list:
+        """Filter conflicten van één type uit het rapport."""
+        return [c for c in report['conflicts'] if c['conflict_type'] == conflict_type]
+    
+    def test_multi_area_print_area(self):
+        """Elk gebied van een print gebied met meerdere gebieden wordt getest."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Sheet"
+        ws.print_area = ['AA1:AB3', 'AD1:AE2']
+        
+        conflicts = self._conflicts(self._audit(wb), 'PRINT_AREA')
+        
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['sheet_name'], "Sheet")
+        self.assertEqual(conflicts[0]['technical_info']['overlapping_columns'], ['AA', 'AB'])
+    
+    def test_print_area_sheet_name_with_exclamation_mark(self):
+        """Sheet prefix met '!' in de naam wordt niet als kolom gelezen."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Prijs!Lijst"
+        ws.print_area = 'A1:AB3'
+        
+        conflicts = self._conflicts(self._audit(wb), 'PRINT_AREA')
+        
+        self.assertEqual(len(conflicts), 1)
+        self.assertIn("'Prijs!Lijst'!", conflicts[0]['technical_info']['print_area'])
+        self.assertEqual(conflicts[0]['technical_info']['overlapping_columns'], ['AA', 'AB'])
+    
+    def test_range_target_overlap_multi_area(self):
+        """Overlap wordt over alle gebieden samengevoegd, in kolom volgorde."""
+        overlaps, columns = self.auditor._range_target_overlap(
+            "'Sheet'!$AB$1:$AB$3,'Sheet'!$AA$1:$AA$2,'Sheet'!$AD$1:$AE$2"
+        )
+        self.assertTrue(overlaps)
+        self.assertEqual(columns, ['AA', 'AB'])
+        
+        overlaps, columns = self.auditor._range_target_overlap("'Sheet'!$A$1:$B$3,'Sheet'!$AD$1:$AE$2")
+        self.assertFalse(overlaps)
+        self.assertEqual(columns, [])
+    
+    def _validation_conflicts(self, formula: str) -> list:
+        """Voer de data validatie check uit voor één lijst formule."""
+        wb = Workbook()
+        ws = wb.active
+        dv = DataValidation(type="list", formula1=formula)
+        dv.add("A2:A20")
+        ws.add_data_validation(dv)
+        conflicts, _ = self.auditor._check_data_validation(ws)
+        return conflicts
+    
+    def test_validation_formula_absolute_range(self):
+        """Absolute verwijzing naar AA wordt als conflict gemeld."""
+        conflicts = self._validation_conflicts("=$AA$1:$AA$10")
+        
+        self.assertEqual([c.technical_info['target_column'] for c in conflicts], ['AA'])
+        self.assertEqual(conflicts[0].technical_info['affected_ranges'], ['A2:A20'])
+    
+    def test_validation_formula_longer_column(self):
+        """Kolom AAA bevat AA maar is geen doelkolom."""
+        self.assertEqual(self._validation_conflicts("=$AAA$1"), [])
+    
+    def test_validation_formula_function_name(self):
+        """Functienaam ABS begint met AB maar is geen kolomverwijzing."""
+        self.assertEqual(self._validation_conflicts("=ABS(1)"), [])
+    
+    def test_named_range_on_target_column(self):
+        """Named range die naar AB verwijst geeft een NAMED_RANGE conflict."""
+        wb = Workbook()
+        wb.active.title = "Prijzen"
+        wb.defined_names["Eenheden"] = DefinedName("Eenheden", attr_text="Prijzen!$AB$2:$AB$50")
+        wb.defined_names["Codes"] = DefinedName("Codes", attr_text="Prijzen!$A$2:$B$50")
+        
+        conflicts = self._conflicts(self._audit(wb), 'NAMED_RANGE')
+        
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['sheet_name'], "Prijzen")
+        self.assertEqual(conflicts[0]['technical_info']['range_name'], "Eenheden")
+        self.assertEqual(conflicts[0]['technical_info']['overlapping_columns'], ['AB'])
+    
+    def test_xml_columns_use_sheet_name_not_part_number(self):
+        """XML conflicten dragen de zichtbare sheet naam, ook als de volgorde afwijkt van sheetN.xml."""
+        wb = Workbook()
+        wb.active.title = "Eerste"
+        tweede = wb.create_sheet("Tweede")
+        tweede.column_dimensions['AA'].width = 15
+        saved_path = Path(self.tmp_dir.name) / "saved.xlsx"
+        wb.save(saved_path)
+        
+        # Zet "Tweede" (sheet2.xml) vooraan in workbook.xml; sheet1.xml blijft "Eerste"
+        file_path = Path(self.tmp_dir.name) / "reordered.xlsx"
+        with ZipFile(saved_path) as source, ZipFile(file_path, 'w') as target:
+            for item in source.infolist():
+                data = source.read(item.filename)
+                if item.filename == 'xl/workbook.xml':
+                    text = data.decode('utf-8')
+                    sheets = re.findall(r'<sheet [^>]*/>', text)
+                    self.assertEqual(len(sheets), 2)
+                    text = text.replace(sheets[0] + sheets[1], sheets[1] + sheets[0])
+                    self.assertIn(sheets[1] + sheets[0], text)
+                    data = text.encode('utf-8')
+                target.writestr(item, data)
+        
+        report = self._audit_path(file_path)
+        conflicts = self._conflicts(report, 'XML_COLUMN_DEFINITION')
+        
+        self.assertEqual(len(conflicts), 1)
+        self.assertEqual(conflicts[0]['sheet_name'], "Tweede")
+        self.assertEqual(conflicts[0]['technical_info']['overlapping_columns'], ['AA'])
+    
+    def test_xml_audit_skips_chartsheets(self):
+        """Chartsheets hebben geen <cols> en worden overgeslagen bij de XML audit."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Data"
+        ws.column_dimensions['AB'].width = 12
+        chartsheet = wb.create_chartsheet("Grafiek")
+        chartsheet.add_chart(BarChart())
+        
+        report = self._audit(wb)
+        conflicts = self._conflicts(report, 'XML_COLUMN_DEFINITION')
+        
+        self.assertEqual([c['sheet_name'] for c in conflicts], ["Data"])
+        self.assertNotIn("Grafiek", self.output)
+        self.assertNotIn("Fout bij XML", self.output)
+    
+    def test_xml_hidden_columns_written_by_openpyxl(self):
+        """openpyxl schrijft hidden="1"; dat telt als verborgen (MEDIUM), zichtbaar blijft HIGH."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Verborgen"
+        for column in ('AA', 'AB'):
+            ws.column_dimensions[column].hidden = True
+        zichtbaar = wb.create_sheet("Zichtbaar")
+        zichtbaar.column_dimensions['AA'].width = 20
+        
+        report = self._audit(wb)
+        conflicts = self._conflicts(report, 'XML_COLUMN_DEFINITION')
+        
+        with ZipFile(Path(self.tmp_dir.name) / "template.xlsx") as zip_file:
+            self.assertIn(b'hidden="1"', zip_file.read('xl/worksheets/sheet1.xml'))
+        
+        hidden_conflicts = [c for c in conflicts if c['sheet_name'] == "Verborgen"]
+        self.assertEqual(
+            sorted(col for c in hidden_conflicts for col in c['technical_info']['overlapping_columns']),
+            ['AA', 'AB']
+        )
+        for conflict in hidden_conflicts:
+            self.assertTrue(conflict['technical_info']['hidden'])
+            self.assertEqual(conflict['severity'], "MEDIUM")
+            self.assertNotIn("NIET verborgen", conflict['details'])
+        
+        visible_conflicts = [c for c in conflicts if c['sheet_name'] == "Zichtbaar"]
+        self.assertEqual(len(visible_conflicts), 1)
+        visible_conflict = visible_conflicts[0]
+        self.assertFalse(visible_conflict['technical_info']['hidden'])
+        self.assertEqual(visible_conflict['severity'], "HIGH")
+    
+    def test_duplicate_conflict_reported_once(self):
+        """Hetzelfde conflict twee keer aangeboden komt één keer in het rapport."""
+        report = self._audit(Workbook())
+        self.assertEqual(report['total_conflicts'], 0)
+        
+        def make_conflict(range_name: str) -> ColumnConflict:
+            return ColumnConflict(
+                conflict_type="NAMED_RANGE",
+                sheet_name="Sheet",
+                details=f"Named range '{range_name}' verwijst naar kolommen ['AA']",
+                severity="MEDIUM",
+                recommendation="Herdefinieer named range om kolommen ['AA'] uit te sluiten",
+                technical_info={
+                    'range_name': range_name,
+                    'range_reference': "$AA$1:$AA$5",
+                    'overlapping_columns': ['AA']
+                }
+            )
+        
+        self.auditor._add_conflict(make_conflict("Lijst"))
+        self.auditor._add_conflict(make_conflict("Lijst"))
+        self.auditor._add_conflict(make_conflict("AndereLijst"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            report = self.auditor._generate_report()
+        
+        self.assertEqual(report['duplicates_suppressed'], 1)
+        self.assertEqual(report['total_conflicts'], 2)
+        self.assertEqual(
+            [c['technical_info']['range_name'] for c in report['conflicts']],
+            ["Lijst", "AndereLijst"]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
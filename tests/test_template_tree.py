@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Tests voor het genereren van een aangepaste template in TemplateTree app.py.
+"""
+
+import contextlib
+import importlib.util
+import io
+import logging
+import threading
+import unittest
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from zipfile import ZipFile
+
+from openpyxl import Workbook, load_workbook
+
+APP_PATH = Path(__file__).parent.parent / "TemplateTree app.py"
+SHEET_XML_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+
+
+def _load_app():
+    """Importeer TemplateTree app.py (bestandsnaam met spatie) als module."""
+    # Zonder Streamlit runtime waarschuwen de cache decorators; dat is hier verwacht
+    logging.getLogger('streamlit').setLevel(logging.ERROR)
+    spec = importlib.util.spec_from_file_location("template_tree_app", APP_PATH)
+    module = importlib.util.module_from_spec(spec)
+    with contextlib.redirect_stderr(io.StringIO()):
+        spec.loader.exec_module(module)
+    return module
+
+
+class TestBuildCustomXlsx(unittest.TestCase):
+    """Test cases voor verbergen binnen een gegroepeerd kolom bereik."""
+    
+    @classmethod
+    def setUpClass(cls):
+        """Laad de app module eenmalig."""
+        cls.app = _load_app()
+    
+    def setUp(self):
+        """Maak basis workbook met een gegroepeerd bereik C:E, opgeslagen en opnieuw geladen."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'PrijsTemplateSheet'
+        ws.append(['ID_Column', 'Naam', 'Medisch', 'Lab', 'Facilitair', 'Prijs'])
+        ws.column_dimensions.group('C', 'E', outline_level=1)
+        ws.column_dimensions['C'].width = 18
+        
+        # Opnieuw laden geeft één dimensie met min=3 max=5, net als de echte template
+        buffer = io.BytesIO()
+        wb.save(buffer)
+        self.base_wb = load_workbook(io.BytesIO(buffer.getvalue()))
+        base = (self.base_wb, threading.Lock())
+        
+        self.originals = {
+            name: getattr(self.app, name) for name in ('_base_workbook', 'get_columns_to_hide')
+        }
+        self.app._base_workbook = lambda: base
+        self.app.get_columns_to_hide = lambda all_orderable, product_type: frozenset({'Lab'})
+        self.app.build_custom_xlsx.clear()
+    
+    def tearDown(self):
+        """Zet de module functies en de cache terug."""
+        for name, func in self.originals.items():
+            setattr(self.app, name, func)
+        self.app.build_custom_xlsx.clear()
+    
+    @staticmethod
+    def _dimension_state(ws):
+        """Vergelijkbare weergave van alle kolom dimensies."""
+        return sorted(
+            (key, dim.min, dim.max, dim.hidden, dim.width, dim.outline_level)
+            for key, dim in ws.column_dimensions.items()
+        )
+    
+    def test_hidden_column_inside_grouped_range(self):
+        """Verborgen kolom binnen een groep geeft geen overlappende <col> en laat de basis intact."""
+        base_ws = self.base_wb['PrijsTemplateSheet']
+        before = self._dimension_state(base_ws)
+        self.assertIn(('C', 3, 5, False, 18, 1), before)
+        
+        data = self.app.build_custom_xlsx(False, 'Allemaal medisch')
+        
+        with ZipFile(io.BytesIO(data)) as zip_file:
+            root = ET.fromstring(zip_file.read('xl/worksheets/sheet1.xml'))
+        cols = [
+            (int(col.get('min')), int(col.get('max')), col.get('hidden') in ('1', 'true'))
+            for col in root.iter(SHEET_XML_NS + 'col')
+        ]
+        
+        # Geen overlap tussen opeenvolgende <col> bereiken
+        ranges = sorted((start, end) for start, end, _ in cols)
+        for (_, prev_end), (next_start, _) in zip(ranges, ranges[1:]):
+            self.assertLess(prev_end, next_start)
+        
+        # Alleen kolom D (Lab) verborgen; C en E blijven zichtbaar binnen de groep
+        hidden_columns = {
+            index for start, end, hidden in cols if hidden for index in range(start, end + 1)
+        }
+        self.assertEqual(hidden_columns, {4})
+        self.assertEqual(
+            {index for start, end, _ in cols for index in range(start, end + 1)},
+            {3, 4, 5}
+        )
+        
+        # Gedeelde basis workbook is na het genereren ongewijzigd
+        self.assertEqual(self._dimension_state(base_ws), before)
+
+
+if __name__ == '__main__':
+    unittest.main()